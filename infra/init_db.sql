@@ -10,6 +10,9 @@
 -- Enable UUID extension for generating unique IDs
 CREATE EXTENSION IF NOT EXISTS "uuid-ossp";
 
+-- Case-insensitive text for emails
+CREATE EXTENSION IF NOT EXISTS citext;
+
 -- Create enum types
 CREATE TYPE transaction_type AS ENUM ('debit', 'credit');
 CREATE TYPE transaction_category AS ENUM (
@@ -21,7 +24,7 @@ CREATE TYPE transaction_category AS ENUM (
 -- Create users table for authentication
 CREATE TABLE IF NOT EXISTS users (
     id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
-    email VARCHAR(255) UNIQUE NOT NULL,
+    email CITEXT UNIQUE NOT NULL CONSTRAINT users_email_length CHECK (length(email) <= 255),
     password_hash VARCHAR(255) NOT NULL,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
@@ -29,14 +32,14 @@ CREATE TABLE IF NOT EXISTS users (
     -- Account Aggregator integration fields
     refresh_token_hash VARCHAR(255),
     aa_consent_token VARCHAR(255),
-    aa_account_id VARCHAR(255)
+    aa_account_id TEXT
 );
 
 -- Create session_tokens table for JWT management
 CREATE TABLE IF NOT EXISTS session_tokens (
     id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
     user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
-    token_id VARCHAR(255) UNIQUE NOT NULL,
+    token_id TEXT UNIQUE NOT NULL,
     expires_at TIMESTAMP WITH TIME ZONE NOT NULL,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
 );
@@ -47,36 +50,39 @@ CREATE INDEX IF NOT EXISTS idx_users_created_at ON users(created_at);
 
 -- Create indexes for session_tokens table
 CREATE INDEX IF NOT EXISTS idx_session_tokens_user_expires ON session_tokens(user_id, expires_at);
-CREATE INDEX IF NOT EXISTS idx_session_tokens_token_id ON session_tokens(token_id);
+-- (token_id, expires_at) lets the blacklist check run as an index-only scan
+CREATE INDEX IF NOT EXISTS idx_session_tokens_tid_exp ON session_tokens(token_id, expires_at);
+DROP INDEX IF EXISTS idx_session_tokens_token_id;
 CREATE INDEX IF NOT EXISTS idx_session_tokens_expires_at ON session_tokens(expires_at);
 );
 
 -- Create accounts table
 CREATE TABLE IF NOT EXISTS accounts (
     id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
-    account_id VARCHAR(255) UNIQUE NOT NULL,
-    account_name VARCHAR(255),
-    bank_name VARCHAR(255),
-    account_type VARCHAR(50),
+    account_id TEXT UNIQUE NOT NULL,
     balance DECIMAL(15,2) DEFAULT 0.00,
-    currency VARCHAR(3) DEFAULT 'INR',
     is_active BOOLEAN DEFAULT true,
+    -- account_name, bank_name, account_type, currency
+    meta JSONB NOT NULL DEFAULT '{"currency": "INR"}',
     created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
 );
 
+-- Index the metadata for the occasional filter on bank name
+CREATE INDEX IF NOT EXISTS idx_accounts_meta_gin ON accounts USING GIN (meta jsonb_path_ops);
+
 -- Create transactions table
 CREATE TABLE IF NOT EXISTS transactions (
     id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
     user_id UUID REFERENCES users(id) ON DELETE CASCADE,
 
     -- Raw transaction data from bank API
-    bank_transaction_id VARCHAR(255) UNIQUE NOT NULL,
+    bank_transaction_id TEXT NOT NULL,
     ts TIMESTAMP WITH TIME ZONE NOT NULL,
     amount DECIMAL(15,2) NOT NULL CHECK (amount > 0),
     type transaction_type NOT NULL,
     raw_desc TEXT NOT NULL,
-    account_id VARCHAR(255) NOT NULL,
+    account_id TEXT NOT NULL,
 
     -- Processed fields
     merchant VARCHAR(255),
@@ -89,22 +95,31 @@ CREATE TABLE IF NOT EXISTS transactions (
 
     -- Foreign key to accounts table
     FOREIGN KEY (account_id) REFERENCES accounts(account_id) ON DELETE CASCADE,
-    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
+
+    -- Bank ids only need to be unique per user
+    CONSTRAINT uq_tx_user_bank UNIQUE NULLS NOT DISTINCT (bank_transaction_id, user_id)
 );
 
 -- Create indexes for better query performance
-CREATE INDEX IF NOT EXISTS idx_transactions_account_id ON transactions(account_id);
-CREATE INDEX IF NOT EXISTS idx_transactions_ts ON transactions(ts DESC);
+CREATE INDEX IF NOT EXISTS idx_tx_user_ts_cov ON transactions(user_id, ts DESC) INCLUDE (amount, type, category);
+CREATE INDEX IF NOT EXISTS idx_tx_acct_ts ON transactions(account_id, ts DESC);
+CREATE INDEX IF NOT EXISTS idx_tx_ts_brin ON transactions USING BRIN (ts) WITH (pages_per_range = 32);
 CREATE INDEX IF NOT EXISTS idx_transactions_category ON transactions(category);
 CREATE INDEX IF NOT EXISTS idx_transactions_merchant ON transactions(merchant);
 CREATE INDEX IF NOT EXISTS idx_transactions_amount ON transactions(amount);
 CREATE INDEX IF NOT EXISTS idx_transactions_type ON transactions(type);
-CREATE INDEX IF NOT EXISTS idx_transactions_user_id ON transactions(user_id);
+CREATE INDEX IF NOT EXISTS idx_transactions_user_ts_debit ON transactions(user_id, ts DESC) WHERE type = 'debit';
+
+-- Superseded by the (user_id, ts) and (account_id, ts) composites above
+DROP INDEX IF EXISTS idx_transactions_user_id;
+DROP INDEX IF EXISTS idx_transactions_account_id;
+DROP INDEX IF EXISTS idx_transactions_ts;
 
 -- Create sync_logs table to track synchronization operations
 CREATE TABLE IF NOT EXISTS sync_logs (
     id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
-    account_id VARCHAR(255) NOT NULL,
+    account_id TEXT NOT NULL,
     from_date DATE NOT NULL,
     to_date DATE NOT NULL,
     user_id UUID REFERENCES users(id) ON DELETE CASCADE,
@@ -154,10 +169,10 @@ CREATE TRIGGER update_transactions_updated_at
     FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
 
 -- Insert sample data for development (optional)
-INSERT INTO accounts (account_id, account_name, bank_name, account_type, balance) 
+INSERT INTO accounts (account_id, balance, meta) 
 VALUES 
-    ('acc_12345', 'Primary Savings', 'HDFC Bank', 'savings', 25000.00),
-    ('acc_67890', 'Salary Account', 'ICICI Bank', 'current', 45000.00)
+    ('acc_12345', 25000.00, '{"account_name": "Primary Savings", "bank_name": "HDFC Bank", "account_type": "savings", "currency": "INR"}'),
+    ('acc_67890', 45000.00, '{"account_name": "Salary Account", "bank_name": "ICICI Bank", "account_type": "current", "currency": "INR"}')
 ON CONFLICT (account_id) DO NOTHING;
 
 -- Sample transactions for development
@@ -168,7 +183,7 @@ INSERT INTO transactions (
     ('txn_001', '2024-01-15 10:30:00+05:30', 250.00, 'debit', 'SWIGGY*ORDER', 'acc_12345', 'Swiggy', 'food', CURRENT_TIMESTAMP),
     ('txn_002', '2024-01-14 15:45:00+05:30', 1200.00, 'debit', 'BIG BAZAAR MUMBAI', 'acc_12345', 'Big Bazaar', 'shopping', CURRENT_TIMESTAMP),
     ('txn_003', '2024-01-13 09:15:00+05:30', 50000.00, 'credit', 'SALARY CREDIT', 'acc_67890', null, 'salary', CURRENT_TIMESTAMP)
-ON CONFLICT (bank_transaction_id) DO NOTHING;
+ON CONFLICT ON CONSTRAINT uq_tx_user_bank DO NOTHING;
 
 -- Insert sample user for development (password: 'testpassword123')
 INSERT INTO users (email, password_hash) 
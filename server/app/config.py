@@ -10,9 +10,6 @@ import os
 # Development Configuration
 DEV_MODE = os.getenv("DEV_MODE", "false").lower() == "true"
 
-# Development Configuration
-DEV_MODE = os.getenv("DEV_MODE", "false").lower() == "true"
-
 # Account Aggregator Configuration
 USE_REAL_AA = os.getenv("USE_REAL_AA", "false").lower() == "true"
 AA_BASE_URL = os.getenv("AA_BASE_URL", "")
@@ -26,6 +23,9 @@ AA_MOCK_WEBHOOK_SECRET = os.getenv("AA_MOCK_WEBHOOK_SECRET", "")
 SYNC_BATCH_SIZE = int(os.getenv("SYNC_BATCH_SIZE", "100"))
 SYNC_POLL_INTERVAL = int(os.getenv("SYNC_POLL_INTERVAL", "30"))
 
+# Database Configuration
+DB_ACQUIRE_TIMEOUT = float(os.getenv("DB_ACQUIRE_TIMEOUT", "2.0"))  # seconds to wait for a pool connection
+
 # Firebase Configuration
 FIREBASE_SERVICE_ACCOUNT_PATH = os.getenv("FIREBASE_SERVICE_ACCOUNT_PATH", "")
 
@@ -46,10 +46,3 @@ def is_dev_mode() -> bool:
     Returns True if the application is running in development mode.
     """
     return DEV_MODE
-
-
-def is_dev_mode() -> bool:
-    """
-    Returns True if the application is running in development mode.
-    """
-    return DEV_MODE
\ No newline at end of file
@@ -1,248 +1,539 @@
+import asyncio
 import asyncpg
-from fastapi import Depends
-from typing import AsyncGenerator
+import logging
+import weakref
+from asyncpg.prepared_stmt import PreparedStatement
+from contextvars import ContextVar, Token
+from fastapi import Depends, HTTPException, status
+from typing import AsyncGenerator, Dict, Final, List, Optional, Tuple
+
+from app.config import DB_ACQUIRE_TIMEOUT
+
+logger = logging.getLogger(__name__)
 
 # Global database pool (set in main.py lifespan)
 db_pool = None
 
+# Per-context pool override, e.g. a shard pool chosen by middleware for one request.
+# The lifespan runs in its own task, so the process-wide pool stays a module global
+_db_pool_override: ContextVar[Optional[asyncpg.Pool]] = ContextVar("db_pool", default=None)
+
+# Queries run on (nearly) every request; prepared on each new pool connection
+HOT_QUERIES: List[str] = []
+
+# Prepared hot statements per connection; entries go away with their connection
+_prepared_statements: "weakref.WeakKeyDictionary[asyncpg.Connection, Dict[str, PreparedStatement]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+# Pool settings that make the hot-query warm-up effective
+POOL_STATEMENT_CACHE_SIZE = 1024
+POOL_SERVER_SETTINGS = {"jit": "off"}  # short OLTP queries never amortize JIT compilation
+
+# Connection recycling, bounding how long server-side plan caches can grow
+POOL_MAX_QUERIES = 10_000
+POOL_MAX_INACTIVE_LIFETIME = 300.0
+
+def register_hot_query(query: str) -> str:
+    """Register a query to be prepared on every new pool connection; returns it unchanged"""
+    HOT_QUERIES.append(query)
+    return query
+
+async def init_connection(connection: asyncpg.Connection):
+    """
+    Pool ``init`` hook: prepare the registered hot queries once per connection
+
+    Connection.prepare() does not populate the statement cache that
+    fetch/execute use, so the handles are kept here and used via prepared().
+    """
+    statements = _prepared_statements.setdefault(connection, {})
+    for query in HOT_QUERIES:
+        try:
+            statements[query] = await connection.prepare(query)
+        except asyncpg.PostgresError as e:
+            # e.g. schema not created yet; the query is prepared on first use instead
+            logger.warning(f"Could not prepare hot query: {e}")
+
+async def prepared(connection, query: str) -> PreparedStatement:
+    """Prepared statement for a hot query on connection (a pool proxy or a raw connection)"""
+    # Pool proxies wrap the connection the init hook saw
+    raw = getattr(connection, "_con", None) or connection
+    statements = _prepared_statements.setdefault(raw, {})
+    statement = statements.get(query)
+    if statement is None:
+        statement = statements[query] = await raw.prepare(query)
+    return statement
+
 def set_db_pool(pool):
-    """Set the global database pool"""
+    """
+    Set the global database pool
+
+    Pools should be created with ``init=init_connection``,
+    ``statement_cache_size=POOL_STATEMENT_CACHE_SIZE`` and
+    ``server_settings=POOL_SERVER_SETTINGS`` so hot queries stay prepared,
+    and with ``max_queries=POOL_MAX_QUERIES`` and
+    ``max_inactive_connection_lifetime=POOL_MAX_INACTIVE_LIFETIME`` so
+    connections (and their cached plans) are recycled regularly.
+    """
     global db_pool
+    if pool is not None:
+        max_queries = getattr(pool, "_max_queries", None)
+        max_inactive = getattr(pool, "_max_inactive_connection_lifetime", None)
+        if max_queries is not None and max_queries > 50_000:
+            logger.warning(f"Pool max_queries={max_queries}; use {POOL_MAX_QUERIES} to recycle connections")
+        if max_inactive is not None and (not max_inactive or max_inactive > 600):
+            logger.warning(
+                f"Pool max_inactive_connection_lifetime={max_inactive}; "
+                f"use {POOL_MAX_INACTIVE_LIFETIME} so idle connections are closed"
+            )
     db_pool = pool
 
+def get_db_pool():
+    """Get the pool for the current context (None when running without a database)"""
+    return _db_pool_override.get() or db_pool
+
+def use_db_pool(pool: asyncpg.Pool) -> Token:
+    """Route get_db/get_db_pool in the current context to pool; undo with reset_db_pool"""
+    return _db_pool_override.set(pool)
+
+def reset_db_pool(token: Token):
+    """Restore the pool that was active before the matching use_db_pool call"""
+    _db_pool_override.reset(token)
+
 async def get_db() -> AsyncGenerator[asyncpg.Connection, None]:
-    """Database dependency for FastAPI routes"""
-    if not db_pool:
-        # Return a mock connection for development
-        yield None
-        return
+    """
+    Database dependency for FastAPI routes
+
+    Assumes a pool is set; apps started without one route this dependency to
+    get_db_mock via use_mock_db(), so requests never branch on the pool here.
+
+    Waiting for a free connection is bounded by DB_ACQUIRE_TIMEOUT; when the
+    pool stays exhausted the request fails fast with 503 instead of queueing.
+    """
+    pool = get_db_pool()
+    try:
+        connection = await pool.acquire(timeout=DB_ACQUIRE_TIMEOUT)
+    except asyncio.TimeoutError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Database is busy, please retry"
+        )
 
-    async with db_pool.acquire() as connection:
+    try:
         yield connection
+    finally:
+        await pool.release(connection)
+
+async def get_db_mock() -> AsyncGenerator[None, None]:
+    """Development stand-in for get_db: yields no connection"""
+    yield None
+
+def use_mock_db(app):
+    """Serve every Depends(get_db) in app with get_db_mock (no database configured)"""
+    app.dependency_overrides[get_db] = get_db_mock
+
+# Bump whenever the DDL below changes so existing databases re-run it
+CURRENT_SCHEMA_VERSION: Final[int] = 11
+
+# Enum types by name, created only when missing from the catalog
+_ENUM_TYPES: Final[Dict[str, str]] = {
+    "transaction_type": "('debit', 'credit')",
+    "transaction_category": """(
+        'food', 'transport', 'shopping', 'entertainment', 
+        'bills', 'healthcare', 'education', 'salary', 
+        'investment', 'other'
+    )""",
+    "aa_consent_status": "('pending', 'active', 'expired', 'revoked', 'failed')",
+    "aa_sync_status": "('running', 'completed', 'failed', 'cancelled')",
+}
+
+# Schema DDL, sent to the server as one batch (the simple query protocol accepts
+# multiple statements in a single message). Every statement is idempotent.
+_INIT_DDL_STATEMENTS: Final[Tuple[str, ...]] = (
+    # Schema version sentinel
+    """
+    CREATE TABLE IF NOT EXISTS schema_migrations (
+        version INTEGER PRIMARY KEY,
+        applied_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+    );
+    """,
+    # Case-insensitive text for emails
+    "CREATE EXTENSION IF NOT EXISTS citext;",
+    # Create users table
+    """
+    CREATE TABLE IF NOT EXISTS users (
+        id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+        email CITEXT UNIQUE NOT NULL CONSTRAINT users_email_length CHECK (length(email) <= 255),
+        password_hash VARCHAR(255) NOT NULL,
+        aa_account_id TEXT UNIQUE,
+        is_active BOOLEAN DEFAULT true,
+        created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+    );
+    """,
+    # Create session_tokens table for JWT blacklisting
+    """
+    CREATE TABLE IF NOT EXISTS session_tokens (
+        id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+        user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+        token_id TEXT UNIQUE NOT NULL,
+        expires_at TIMESTAMP WITH TIME ZONE NOT NULL,
+        created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+    );
+    """,
+    # Create accounts table
+    """
+    CREATE TABLE IF NOT EXISTS accounts (
+        id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+        account_id TEXT UNIQUE NOT NULL,
+        user_id UUID REFERENCES users(id) ON DELETE CASCADE,
+        balance DECIMAL(15,2) DEFAULT 0.00,
+        is_active BOOLEAN DEFAULT true,
+        -- account_name, bank_name, account_type, currency
+        meta JSONB NOT NULL DEFAULT '{"currency": "INR"}',
+        created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+    );
+    """,
+    # Fold the descriptive accounts columns of older schemas into meta
+    """
+    DO $$ BEGIN
+        IF EXISTS (
+            SELECT 1 FROM information_schema.columns
+            WHERE table_schema = current_schema() AND table_name = 'accounts' AND column_name = 'bank_name'
+        ) THEN
+            ALTER TABLE accounts ADD COLUMN IF NOT EXISTS meta JSONB NOT NULL DEFAULT '{"currency": "INR"}';
+            UPDATE accounts SET meta = meta || jsonb_strip_nulls(jsonb_build_object(
+                'account_name', account_name,
+                'bank_name', bank_name,
+                'account_type', account_type,
+                'currency', currency
+            ));
+            ALTER TABLE accounts
+                DROP COLUMN account_name,
+                DROP COLUMN bank_name,
+                DROP COLUMN account_type,
+                DROP COLUMN currency;
+        END IF;
+    END $$;
+    """,
+    # Create transactions table with user association
+    """
+    CREATE TABLE IF NOT EXISTS transactions (
+        id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+        bank_transaction_id TEXT NOT NULL,
+        user_id UUID REFERENCES users(id) ON DELETE CASCADE,
+        ts TIMESTAMP WITH TIME ZONE NOT NULL,
+        amount DECIMAL(15,2) NOT NULL CHECK (amount > 0),
+        type transaction_type NOT NULL,
+        raw_desc TEXT NOT NULL,
+        account_id TEXT NOT NULL,
+        merchant VARCHAR(255),
+        category transaction_category,
+        processed_at TIMESTAMP WITH TIME ZONE,
+        created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+        -- Bank ids are unique per user. bank_transaction_id leads so the id-only
+        -- dedup lookups still use this index; NULLS NOT DISTINCT keeps user-less rows unique
+        CONSTRAINT uq_tx_user_bank UNIQUE NULLS NOT DISTINCT (bank_transaction_id, user_id)
+    );
+    """,
+    # Create AA consent table
+    """
+    CREATE TABLE IF NOT EXISTS aa_consents (
+        id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+        user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+        ref_id TEXT UNIQUE NOT NULL,
+        status aa_consent_status NOT NULL DEFAULT 'pending',
+        encrypted_token TEXT,
+        created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+        last_polled_at TIMESTAMP WITH TIME ZONE
+    );
+    """,
+    # Create AA accounts table
+    """
+    CREATE TABLE IF NOT EXISTS aa_accounts (
+        id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+        user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+        aa_account_id TEXT NOT NULL,
+        display_name VARCHAR(255),
+        last_sync_at TIMESTAMP WITH TIME ZONE,
+        created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+        UNIQUE(user_id, aa_account_id)
+    );
+    """,
+    # Create AA sync logs table
+    """
+    CREATE TABLE IF NOT EXISTS aa_sync_logs (
+        id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+        user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+        account_id UUID REFERENCES aa_accounts(id) ON DELETE CASCADE,
+        start_ts TIMESTAMP WITH TIME ZONE NOT NULL,
+        end_ts TIMESTAMP WITH TIME ZONE,
+        status aa_sync_status NOT NULL DEFAULT 'running',
+        inserted_count INTEGER DEFAULT 0 NOT NULL,
+        error_text TEXT,
+        created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+    );
+    """,
+    # Bring tables created before the id columns moved to TEXT/CITEXT up to date.
+    # VARCHAR -> TEXT is binary compatible, so those columns are not rewritten
+    """
+    ALTER TABLE users
+        ALTER COLUMN email TYPE CITEXT,
+        ALTER COLUMN aa_account_id TYPE TEXT,
+        DROP CONSTRAINT IF EXISTS users_email_length,
+        ADD CONSTRAINT users_email_length CHECK (length(email) <= 255);
+    ALTER TABLE session_tokens ALTER COLUMN token_id TYPE TEXT;
+    ALTER TABLE accounts ALTER COLUMN account_id TYPE TEXT;
+    ALTER TABLE transactions
+        ALTER COLUMN bank_transaction_id TYPE TEXT,
+        ALTER COLUMN account_id TYPE TEXT;
+    ALTER TABLE aa_consents ALTER COLUMN ref_id TYPE TEXT;
+    ALTER TABLE aa_accounts ALTER COLUMN aa_account_id TYPE TEXT;
+    """,
+    # Replace the global bank_transaction_id unique constraint on existing tables
+    """
+    DO $$ BEGIN
+        IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'uq_tx_user_bank') THEN
+            ALTER TABLE transactions
+                ADD CONSTRAINT uq_tx_user_bank UNIQUE NULLS NOT DISTINCT (bank_transaction_id, user_id);
+        END IF;
+    END $$;
+    ALTER TABLE transactions DROP CONSTRAINT IF EXISTS transactions_bank_transaction_id_key;
+    """,
+    # Finer histograms for the skewed status enum, so the partial indexes get good estimates
+    "ALTER TABLE aa_consents ALTER COLUMN status SET STATISTICS 1000;",
+    # ... and for the join keys, so join cardinalities are estimated from real distributions
+    """
+    ALTER TABLE transactions
+        ALTER COLUMN user_id SET STATISTICS 1000,
+        ALTER COLUMN account_id SET STATISTICS 1000,
+        ALTER COLUMN bank_transaction_id SET STATISTICS 1000;
+    """,
+)
+
+_INIT_DDL: Final[str] = "\n".join(_INIT_DDL_STATEMENTS)
+
+_SCHEMA_VERSION_SQL: Final[str] = "SELECT version FROM schema_migrations WHERE version = $1"
+_RECORD_SCHEMA_VERSION_SQL: Final[str] = (
+    "INSERT INTO schema_migrations (version) VALUES ($1) ON CONFLICT DO NOTHING"
+)
+# Refresh planner statistics once the schema and indexes are in place
+_ANALYZE_SQL: Final[str] = (
+    "ANALYZE users, accounts, transactions, aa_consents, aa_accounts, aa_sync_logs"
+)
+# Also sets the visibility map, so the blacklist probe can skip the heap entirely
+_VACUUM_SQL: Final[str] = "VACUUM (ANALYZE) session_tokens"
+_EXISTING_TYPES_SQL: Final[str] = """
+    SELECT typname FROM pg_type
+    WHERE typname = ANY($1::text[]) AND typnamespace = current_schema()::regnamespace
+"""
+
+# Indexes for performance as (name, target). Built with CREATE INDEX CONCURRENTLY
+# after the tables commit, so builds don't lock out writes on populated tables
+_INDEXES: Final[Tuple[Tuple[str, str], ...]] = (
+    ("idx_users_email", "users(email)"),
+    ("idx_session_tokens_user_id", "session_tokens(user_id)"),
+    # Answers the blacklist check (token_id = $1 AND expires_at > NOW()) with an index-only scan
+    ("idx_session_tokens_tid_exp", "session_tokens(token_id, expires_at)"),
+    ("idx_session_tokens_expires_at", "session_tokens(expires_at)"),
+    ("idx_accounts_user_id", "accounts(user_id)"),
+    ("idx_accounts_meta_gin", "accounts USING GIN (meta jsonb_path_ops)"),
+    # Covers the dashboard aggregates, so they can be answered with index-only scans
+    ("idx_tx_user_ts_cov", "transactions(user_id, ts DESC) INCLUDE (amount, type, category)"),
+    ("idx_tx_acct_ts", "transactions(account_id, ts DESC)"),
+    ("idx_tx_ts_brin", "transactions USING BRIN (ts) WITH (pages_per_range = 32)"),
+    ("idx_transactions_user_ts_debit", "transactions(user_id, ts DESC) WHERE type = 'debit'"),
+    ("idx_transactions_category", "transactions(category)"),
+    ("idx_aa_consents_user_id", "aa_consents(user_id)"),
+    ("idx_aa_consents_active", "aa_consents(user_id, updated_at) WHERE status IN ('pending', 'active')"),
+    ("idx_aa_consents_ref_id", "aa_consents(ref_id)"),
+    ("idx_aa_accounts_user_id", "aa_accounts(user_id)"),
+    ("idx_aa_accounts_aa_account_id", "aa_accounts(aa_account_id)"),
+    ("idx_aa_sync_logs_user_start_ts", "aa_sync_logs(user_id, start_ts DESC)"),
+    ("idx_aa_sync_logs_account_id", "aa_sync_logs(account_id)"),
+    ("idx_aa_sync_running", "aa_sync_logs(user_id, start_ts) WHERE status = 'running'"),
+    ("idx_aa_sync_logs_start_ts_brin", "aa_sync_logs USING BRIN (start_ts) WITH (pages_per_range = 32)"),
+)
+
+# Indexes superseded by the composites above; dropped once their replacements exist
+_DROPPED_INDEXES: Final[Tuple[str, ...]] = (
+    "idx_session_tokens_token_id",
+    "idx_transactions_user_id",
+    "idx_transactions_account_id",
+    "idx_transactions_ts",
+    "idx_tx_user_ts",
+    "idx_aa_consents_status",
+    "idx_aa_sync_logs_status",
+    "idx_aa_sync_logs_user_id",
+    "idx_aa_sync_logs_start_ts",
+)
+
+# Tables whose index builds may run at the same time (each holds one pool connection)
+_INDEX_BUILD_CONCURRENCY: Final[int] = 2
+
+_INVALID_INDEXES_SQL: Final[str] = """
+    SELECT c.relname FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid
+    WHERE NOT i.indisvalid AND c.relname = ANY($1::text[])
+"""
+
+# Background index build started by init_db
+_index_build_task: Optional[asyncio.Task] = None
+
+# Startup summary, logged once instead of printed line by line
+_INIT_OK_MSG: Final[str] = "\n".join((
+    "\u2705 Database tables initialized successfully",
+    "   - Users table with authentication support",
+    "   - Session tokens table for JWT blacklisting",
+    "   - Accounts table with user association",
+    "   - Transactions table with user association",
+    "   - AA consent table for Account Aggregator consent management",
+    "   - AA accounts table for Account Aggregator account tracking",
+    "   - AA sync logs table for audit and monitoring",
+    "   - All indexes created for optimal performance",
+))
+_INIT_PARTIAL_MSG: Final[str] = (
+    "\u26a0\ufe0f Database tables initialized, but some indexes failed to build; "
+    "they will be retried on next startup"
+)
+
+async def _create_index(connection: asyncpg.Connection, name: str, target: str) -> bool:
+    """Build one index concurrently; returns False on failure"""
+    try:
+        # CONCURRENTLY cannot run inside a transaction block
+        await connection.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {target}")
+        return True
+    except asyncpg.PostgresError as e:
+        logger.warning(f"Index {name} build failed: {e}")
+        # A failed concurrent build leaves an INVALID index that IF NOT EXISTS would keep skipping
+        try:
+            await connection.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+        except asyncpg.PostgresError:
+            pass
+        return False
+
+async def _drop_index(connection: asyncpg.Connection, name: str) -> bool:
+    """Drop one index concurrently; returns False on failure"""
+    try:
+        await connection.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+        return True
+    except asyncpg.PostgresError as e:
+        logger.warning(f"Index {name} drop failed: {e}")
+        return False
+
+async def _build_table_indexes(
+    pool: asyncpg.Pool,
+    indexes: List[Tuple[str, str]],
+    semaphore: asyncio.Semaphore
+) -> bool:
+    """Build one table's indexes one after another on a single connection"""
+    async with semaphore, pool.acquire() as connection:
+        built = True
+        for name, target in indexes:
+            built = await _create_index(connection, name, target) and built
+        return built
+
+async def _build_indexes(pool: asyncpg.Pool):
+    """
+    Background half of init_db: build indexes, retire superseded ones, refresh
+    statistics and record the schema version
+
+    Concurrent builds on the same table queue on its SHARE UPDATE EXCLUSIVE lock,
+    so each table's indexes are built in sequence; at most
+    _INDEX_BUILD_CONCURRENCY tables (and pool connections) are busy at once.
+    """
+    async with pool.acquire() as connection:
+        # An interrupted build (e.g. shutdown mid-build) leaves an INVALID index behind
+        for row in await connection.fetch(_INVALID_INDEXES_SQL, [name for name, _ in _INDEXES]):
+            await _drop_index(connection, row["relname"])
+
+    by_table: Dict[str, List[Tuple[str, str]]] = {}
+    for name, target in _INDEXES:
+        by_table.setdefault(target.split("(")[0].split()[0], []).append((name, target))
+
+    semaphore = asyncio.Semaphore(_INDEX_BUILD_CONCURRENCY)
+    built = await asyncio.gather(
+        *(_build_table_indexes(pool, indexes, semaphore) for indexes in by_table.values())
+    )
+
+    async with pool.acquire() as connection:
+        # Retire the old single-column indexes only after the composites are in place
+        if all(built):
+            built = [await _drop_index(connection, name) for name in _DROPPED_INDEXES]
+
+        # A fresh cluster has no statistics until autovacuum gets around to it
+        await connection.execute(_ANALYZE_SQL)
+        # VACUUM cannot share a statement string (an implicit transaction) with anything else
+        await connection.execute(_VACUUM_SQL)
+
+        # Only record the version once everything exists, so a failed build is retried next boot
+        if all(built):
+            await connection.execute(_RECORD_SCHEMA_VERSION_SQL, CURRENT_SCHEMA_VERSION)
+
+    if all(built):
+        logger.info(_INIT_OK_MSG)
+    else:
+        logger.warning(_INIT_PARTIAL_MSG)
+
+def _on_index_build_done(task: asyncio.Task):
+    if not task.cancelled() and task.exception() is not None:
+        logger.error(f"Background index build failed: {task.exception()}")
 
 async def init_db(pool: asyncpg.Pool):
-    """Initialize database tables"""
+    """
+    Initialize database tables
+
+    Tables and types are created before this returns; indexes are built by a
+    background task afterwards (see _build_indexes), so startup doesn't wait on them.
+    """
+    global _index_build_task
+
     if not pool:
         return
 
     set_db_pool(pool)
 
     async with pool.acquire() as connection:
-        # Create enum types
-        await connection.execute("""
-            DO $$ BEGIN
-                CREATE TYPE transaction_type AS ENUM ('debit', 'credit');
-            EXCEPTION
-                WHEN duplicate_object THEN null;
-            END $$;
-        """)
-
-        await connection.execute("""
-            DO $$ BEGIN
-                CREATE TYPE transaction_category AS ENUM (
-                    'food', 'transport', 'shopping', 'entertainment', 
-                    'bills', 'healthcare', 'education', 'salary', 
-                    'investment', 'other'
-                );
-            EXCEPTION
-                WHEN duplicate_object THEN null;
-            END $$;
-        """)
-
-        # Create AA enum types
-        await connection.execute("""
-            DO $$ BEGIN
-                CREATE TYPE aa_consent_status AS ENUM (
-                    'pending', 'active', 'expired', 'revoked', 'failed'
-                );
-            EXCEPTION
-                WHEN duplicate_object THEN null;
-            END $$;
-        """)
-
-        await connection.execute("""
-            DO $$ BEGIN
-                CREATE TYPE aa_sync_status AS ENUM (
-                    'running', 'completed', 'failed', 'cancelled'
-                );
-            EXCEPTION
-                WHEN duplicate_object THEN null;
-            END $$;
-        """)
-
-        # Create users table
-        await connection.execute("""
-            CREATE TABLE IF NOT EXISTS users (
-                id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
-                email VARCHAR(255) UNIQUE NOT NULL,
-                password_hash VARCHAR(255) NOT NULL,
-                aa_account_id VARCHAR(255) UNIQUE,
-                is_active BOOLEAN DEFAULT true,
-                created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-
-        # Create session_tokens table for JWT blacklisting
-        await connection.execute("""
-            CREATE TABLE IF NOT EXISTS session_tokens (
-                id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
-                user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
-                token_id VARCHAR(255) UNIQUE NOT NULL,
-                expires_at TIMESTAMP WITH TIME ZONE NOT NULL,
-                created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-
-        # Create accounts table
-        await connection.execute("""
-            CREATE TABLE IF NOT EXISTS accounts (
-                id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
-                account_id VARCHAR(255) UNIQUE NOT NULL,
-                user_id UUID REFERENCES users(id) ON DELETE CASCADE,
-                account_name VARCHAR(255),
-                bank_name VARCHAR(255),
-                account_type VARCHAR(50),
-                balance DECIMAL(15,2) DEFAULT 0.00,
-                currency VARCHAR(3) DEFAULT 'INR',
-                is_active BOOLEAN DEFAULT true,
-                created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-
-        # Create transactions table with user association
-        await connection.execute("""
-            CREATE TABLE IF NOT EXISTS transactions (
-                id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
-                bank_transaction_id VARCHAR(255) UNIQUE NOT NULL,
-                user_id UUID REFERENCES users(id) ON DELETE CASCADE,
-                ts TIMESTAMP WITH TIME ZONE NOT NULL,
-                amount DECIMAL(15,2) NOT NULL CHECK (amount > 0),
-                type transaction_type NOT NULL,
-                raw_desc TEXT NOT NULL,
-                account_id VARCHAR(255) NOT NULL,
-                merchant VARCHAR(255),
-                category transaction_category,
-                processed_at TIMESTAMP WITH TIME ZONE,
-                created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-
-        # Create AA consent table
-        await connection.execute("""
-            CREATE TABLE IF NOT EXISTS aa_consents (
-                id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
-                user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
-                ref_id VARCHAR(255) UNIQUE NOT NULL,
-                status aa_consent_status NOT NULL DEFAULT 'pending',
-                encrypted_token TEXT,
-                created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
-                last_polled_at TIMESTAMP WITH TIME ZONE
-            )
-        """)
-
-        # Create AA accounts table
-        await connection.execute("""
-            CREATE TABLE IF NOT EXISTS aa_accounts (
-                id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
-                user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
-                aa_account_id VARCHAR(255) NOT NULL,
-                display_name VARCHAR(255),
-                last_sync_at TIMESTAMP WITH TIME ZONE,
-                created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
-                UNIQUE(user_id, aa_account_id)
-            )
-        """)
-
-        # Create AA sync logs table
-        await connection.execute("""
-            CREATE TABLE IF NOT EXISTS aa_sync_logs (
-                id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
-                user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
-                account_id UUID REFERENCES aa_accounts(id) ON DELETE CASCADE,
-                start_ts TIMESTAMP WITH TIME ZONE NOT NULL,
-                end_ts TIMESTAMP WITH TIME ZONE,
-                status aa_sync_status NOT NULL DEFAULT 'running',
-                inserted_count INTEGER DEFAULT 0 NOT NULL,
-                error_text TEXT,
-                created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-
-        # Create indexes for performance
-        await connection.execute("""
-            CREATE INDEX IF NOT EXISTS idx_users_email ON users(email)
-        """)
-        await connection.execute("""
-            CREATE INDEX IF NOT EXISTS idx_session_tokens_user_id ON session_tokens(user_id)
-        """)
-        await connection.execute("""
-            CREATE INDEX IF NOT EXISTS idx_session_tokens_token_id ON session_tokens(token_id)
-        """)
-        await connection.execute("""
-            CREATE INDEX IF NOT EXISTS idx_session_tokens_expires_at ON session_tokens(expires_at)
-        """)
-        await connection.execute("""
-            CREATE INDEX IF NOT EXISTS idx_accounts_user_id ON accounts(user_id)
-        """)
-        await connection.execute("""
-            CREATE INDEX IF NOT EXISTS idx_transactions_user_id ON transactions(user_id)
-        """)
-        await connection.execute("""
-            CREATE INDEX IF NOT EXISTS idx_transactions_account_id ON transactions(account_id)
-        """)
-        await connection.execute("""
-            CREATE INDEX IF NOT EXISTS idx_transactions_ts ON transactions(ts DESC)
-        """)
-        await connection.execute("""
-            CREATE INDEX IF NOT EXISTS idx_transactions_category ON transactions(category)
-        """)
-        await connection.execute("""
-            CREATE INDEX IF NOT EXISTS idx_aa_consents_user_id ON aa_consents(user_id)
-        """)
-        await connection.execute("""
-            CREATE INDEX IF NOT EXISTS idx_aa_consents_status ON aa_consents(status)
-        """)
-        await connection.execute("""
-            CREATE INDEX IF NOT EXISTS idx_aa_consents_ref_id ON aa_consents(ref_id)
-        """)
-        await connection.execute("""
-            CREATE INDEX IF NOT EXISTS idx_aa_accounts_user_id ON aa_accounts(user_id)
-        """)
-        await connection.execute("""
-            CREATE INDEX IF NOT EXISTS idx_aa_accounts_aa_account_id ON aa_accounts(aa_account_id)
-        """)
-        await connection.execute("""
-            CREATE INDEX IF NOT EXISTS idx_aa_sync_logs_user_id ON aa_sync_logs(user_id)
-        """)
-        await connection.execute("""
-            CREATE INDEX IF NOT EXISTS idx_aa_sync_logs_account_id ON aa_sync_logs(account_id)
-        """)
-        await connection.execute("""
-            CREATE INDEX IF NOT EXISTS idx_aa_sync_logs_status ON aa_sync_logs(status)
-        """)
-        await connection.execute("""
-            CREATE INDEX IF NOT EXISTS idx_aa_sync_logs_start_ts ON aa_sync_logs(start_ts)
-        """)
-
-        print("✅ Database tables initialized successfully")
-        print("   - Users table with authentication support")
-        print("   - Session tokens table for JWT blacklisting")
-        print("   - Accounts table with user association")
-        print("   - Transactions table with user association")
-        print("   - AA consent table for Account Aggregator consent management")
-        print("   - AA accounts table for Account Aggregator account tracking")
-        print("   - AA sync logs table for audit and monitoring")
-        print("   - All indexes created for optimal performance")
+        # Skip the DDL entirely when this schema version was already applied
+        try:
+            applied = await connection.fetchval(_SCHEMA_VERSION_SQL, CURRENT_SCHEMA_VERSION)
+        except asyncpg.UndefinedTableError:
+            applied = None
+
+        if applied is not None:
+            logger.info("\u2705 Database schema up to date (version %d)", CURRENT_SCHEMA_VERSION)
+            return
+
+        # Look the enum types up once instead of trying to create each one
+        existing_types = {
+            row["typname"] for row in await connection.fetch(_EXISTING_TYPES_SQL, list(_ENUM_TYPES))
+        }
+        create_types = [
+            f"CREATE TYPE {name} AS ENUM {values};"
+            for name, values in _ENUM_TYPES.items() if name not in existing_types
+        ]
+
+        # One round trip for the whole schema; a failure rolls everything back
+        async with connection.transaction():
+            await connection.execute("\n".join([*create_types, _INIT_DDL]))
+
+    _index_build_task = asyncio.create_task(_build_indexes(pool))
+    _index_build_task.add_done_callback(_on_index_build_done)
+    logger.info("Database tables ready; building indexes in the background")
 
 async def close_db():
-    """Close database connections"""
+    """Close database connections, stopping any background index build first"""
     global db_pool
+    if _index_build_task is not None and not _index_build_task.done():
+        _index_build_task.cancel()
+        try:
+            await _index_build_task
+        except asyncio.CancelledError:
+            pass
     if db_pool:
         await db_pool.close()
         db_pool = None
\ No newline at end of file
@@ -5,65 +5,213 @@ Provides reusable authentication dependencies and decorators for protecting rout
 Handles JWT token parsing, validation, blacklist checking, and user loading.
 """
 
+import asyncio
+import hashlib
 import logging
+import re
+import time
+import uuid
+from dataclasses import dataclass
 from datetime import datetime
-from typing import Optional, Dict, Any, Callable
+from typing import Optional, Dict, Any, Callable, Mapping, Tuple, Union
 from functools import wraps
 
 import asyncpg
+from cachetools import TTLCache
 from fastapi import Depends, HTTPException, status, Request
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
-from app.database import get_db
+from app.database import get_db, prepared, register_hot_query
 from app.security import decode_token, extract_user_id_from_token, extract_token_id_from_token
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
-# Security scheme for Bearer token
-security = HTTPBearer(auto_error=False)
 
+async def _bearer(request: Request) -> Optional[str]:
+    """Extract the Bearer token from the Authorization header, or None"""
+    header = request.headers.get("authorization")
+    if header and header[:7].lower() == "bearer ":
+        return header[7:]
+    return None
 
-class AuthenticatedUser:
-    """
-    Authenticated user data container
 
-    Provides a clean interface for accessing user data in protected routes.
+# Cheap shape check run before any signature verification: three base64url segments
+_JWT_RE = re.compile(r"[A-Za-z0-9_-]+\.[A-Za-z0-9_-]+\.[A-Za-z0-9_-]+")
+_JWT_MIN_LENGTH = 50
+_JWT_MAX_LENGTH = 4096
+
+# Redis client for the shared token blacklist (will be set from main.py)
+redis_client = None
+
+# Redis key prefix for revoked token IDs; keys expire with the token itself
+_BLACKLIST_KEY_PREFIX = "bl:"
+
+
+def set_redis_client(client):
+    """Set Redis client from main.py"""
+    global redis_client
+    redis_client = client
+
+
+# Postgres channel carrying revoked token IDs to every worker's in-process caches
+TOKEN_REVOKED_CHANNEL = "token_revoked"
+
+# Dedicated LISTEN connection (pool connections drop their listeners on release)
+_revocation_listener: Optional[asyncpg.Connection] = None
+
+# Queries run on every authenticated request
+_TOKEN_BLACKLISTED_SQL = register_hot_query("""
+            SELECT EXISTS(
+                SELECT 1 FROM session_tokens 
+                WHERE token_id = $1 AND expires_at > NOW()
+            )
+        """)
+
+_LOAD_USER_SQL = register_hot_query("""
+            SELECT id, email, created_at, aa_account_id
+            FROM users 
+            WHERE id = $1
+        """)
+
+# Blacklist check and user load in one round trip
+_AUTH_CONTEXT_SQL = register_hot_query("""
+            WITH bl AS (
+                SELECT 1 FROM session_tokens
+                WHERE token_id = $1 AND expires_at > NOW()
+            )
+            SELECT u.id, u.email, u.created_at, u.aa_account_id,
+                   EXISTS(SELECT 1 FROM bl) AS blacklisted
+            FROM users u
+            WHERE u.id = $2
+        """)
+
+# Recent blacklist results by token ID, so repeat requests skip the lookup.
+# Blacklisted results expire quickly so changes to session_tokens propagate
+_token_ok_cache: TTLCache = TTLCache(maxsize=10_000, ttl=30)
+_token_blacklisted_cache: TTLCache = TTLCache(maxsize=10_000, ttl=5)
+
+
+# Verified JWT payloads keyed by a digest of the token, so repeat requests skip
+# signature verification. The raw token is never kept in memory
+_decoded_token_cache: TTLCache = TTLCache(maxsize=10_000, ttl=60)
+
+
+def _decode_cached(token: str) -> Dict[str, Any]:
+    """decode_token with a short-lived cache; still rejects tokens past their exp"""
+    key = hashlib.blake2b(token.encode(), digest_size=16).digest()
+    payload = _decoded_token_cache.get(key)
+    if payload is not None and payload.get("exp", 0) > time.time():
+        return payload
+
+    # Misses and expired entries go through full verification (which raises on failure)
+    payload = decode_token(token)
+    _decoded_token_cache[key] = payload
+    return payload
+
+
+def invalidate_token(token_id: str) -> None:
+    """Drop any cached blacklist result for token_id (call after revoking it)"""
+    _token_ok_cache.pop(token_id, None)
+    _token_blacklisted_cache.pop(token_id, None)
+
+
+def _on_token_revoked(connection, pid, channel, token_id: str) -> None:
+    """LISTEN callback: stop trusting a cached result for a token revoked by any worker"""
+    invalidate_token(token_id)
+    _token_blacklisted_cache[token_id] = True
+
+
+async def start_revocation_listener(dsn: str) -> None:
+    """Subscribe this process to TOKEN_REVOKED_CHANNEL (call once at startup)"""
+    global _revocation_listener
+    try:
+        _revocation_listener = await asyncpg.connect(dsn)
+        await _revocation_listener.add_listener(TOKEN_REVOKED_CHANNEL, _on_token_revoked)
+    except Exception as e:
+        # Without it, revocations from other workers apply once cached results expire
+        logger.warning("Token revocation listener unavailable: %s", e)
+        _revocation_listener = None
+
+
+async def stop_revocation_listener() -> None:
+    """Close the revocation listener connection (call at shutdown)"""
+    global _revocation_listener
+    if _revocation_listener is not None:
+        await _revocation_listener.close()
+        _revocation_listener = None
+
+
+async def blacklist_token(
+    token_id: str,
+    expires_at: float,
+    db: Optional[asyncpg.Connection] = None
+) -> None:
     """
+    Revoke a token for every worker until its exp (a Unix timestamp)
 
-    def __init__(self, user_data: Dict[str, Any], token_payload: Dict[str, Any]):
-        self._user_data = user_data
-        self._token_payload = token_payload
+    Written to Redis when available; this process stops accepting it immediately,
+    and with db other workers are told over TOKEN_REVOKED_CHANNEL.
+    """
+    invalidate_token(token_id)
+    _token_blacklisted_cache[token_id] = True
+
+    if db is not None:
+        try:
+            # Delivered on commit when db is inside a transaction
+            await db.execute("SELECT pg_notify($1, $2)", TOKEN_REVOKED_CHANNEL, token_id)
+        except Exception as e:
+            logger.error("Failed to publish revocation of %s: %s", token_id, e)
+
+    ttl = int(expires_at - time.time())
+    if redis_client is None or ttl <= 0:
+        return
+    try:
+        await redis_client.setex(f"{_BLACKLIST_KEY_PREFIX}{token_id}", ttl, "1")
+    except Exception as e:
+        logger.error("Failed to blacklist token %s in Redis: %s", token_id, e)
 
-    @property
-    def id(self) -> str:
-        """User UUID"""
-        return str(self._user_data["id"])
 
-    @property
-    def email(self) -> str:
-        """User email address"""
-        return self._user_data["email"]
+async def _redis_blacklisted(token_id: str) -> bool:
+    """True if Redis holds a revocation for token_id; False when absent or Redis is unavailable"""
+    if redis_client is None:
+        return False
+    try:
+        return bool(await redis_client.exists(f"{_BLACKLIST_KEY_PREFIX}{token_id}"))
+    except Exception as e:
+        logger.warning("Redis blacklist check failed: %s", e)
+        return False
 
-    @property
-    def created_at(self) -> datetime:
-        """User account creation timestamp"""
-        return self._user_data["created_at"]
 
-    @property
-    def aa_account_id(self) -> Optional[str]:
-        """Account Aggregator account ID (if linked)"""
-        return self._user_data.get("aa_account_id")
+@dataclass(frozen=True, repr=False)
+class AuthenticatedUser:
+    """
+    Authenticated user data container
 
-    @property
-    def token_id(self) -> str:
-        """Current JWT token ID"""
-        return self._token_payload.get("jti", "")
+    Provides a clean interface for accessing user data in protected routes.
+    Values are resolved once in from_row(), so attribute reads are plain slot loads.
+    """
 
-    @property
-    def token_type(self) -> str:
-        """Token type (access/refresh)"""
-        return self._token_payload.get("type", "access")
+    # _dict is not a field: it caches to_dict() and stays out of eq/hash
+    __slots__ = ("id", "email", "created_at", "aa_account_id", "token_id", "token_type", "_dict")
+
+    id: str                        # User UUID
+    email: str                     # User email address
+    created_at: datetime           # User account creation timestamp
+    aa_account_id: Optional[str]   # Account Aggregator account ID (if linked)
+    token_id: str                  # Current JWT token ID
+    token_type: str                # Token type (access/refresh)
+
+    @classmethod
+    def from_row(cls, user_data: Mapping[str, Any], token_payload: Dict[str, Any]) -> "AuthenticatedUser":
+        """Build from a users record (or dict) and the decoded token payload"""
+        return cls(
+            id=str(user_data["id"]),
+            email=user_data["email"],
+            created_at=user_data["created_at"],
+            aa_account_id=user_data.get("aa_account_id"),
+            token_id=token_payload.get("jti", ""),
+            token_type=token_payload.get("type", "access"),
+        )
 
     @property
     def is_authenticated(self) -> bool:
@@ -71,16 +219,23 @@ class AuthenticatedUser:
         return True
 
     def to_dict(self) -> Dict[str, Any]:
-        """Convert to dictionary representation"""
-        return {
+        """Convert to dictionary representation (built once and shared; do not mutate)"""
+        try:
+            return self._dict
+        except AttributeError:
+            pass
+
+        data = {
             "id": self.id,
             "email": self.email,
             "created_at": self.created_at,
             "aa_account_id": self.aa_account_id,
             "token_id": self.token_id,
             "token_type": self.token_type,
-            "is_authenticated": self.is_authenticated
+            "is_authenticated": True
         }
+        object.__setattr__(self, "_dict", data)
+        return data
 
     def __str__(self) -> str:
         return f"AuthenticatedUser(id={self.id}, email={self.email})"
@@ -100,24 +255,34 @@ async def _is_token_blacklisted(db: asyncpg.Connection, token_id: str) -> bool:
     Returns:
         True if token is blacklisted, False otherwise
     """
-    try:
-        result = await db.fetchval("""
-            SELECT EXISTS(
-                SELECT 1 FROM session_tokens 
-                WHERE token_id = $1 AND expires_at > $2
-            )
-        """, token_id, datetime.utcnow())
+    if token_id in _token_ok_cache:
+        return False
+    if token_id in _token_blacklisted_cache:
+        return True
 
-        return bool(result)
+    if await _redis_blacklisted(token_id):
+        _token_blacklisted_cache[token_id] = True
+        return True
+
+    try:
+        statement = await prepared(db, _TOKEN_BLACKLISTED_SQL)
+        result = await statement.fetchval(token_id)
 
     except Exception as e:
-        logger.error(f"Token blacklist check failed: {e}")
+        logger.error("Token blacklist check failed: %s", e)
         # In case of database error, assume token is not blacklisted
         # This prevents authentication from failing due to DB issues
         return False
 
+    blacklisted = bool(result)
+    if blacklisted:
+        _token_blacklisted_cache[token_id] = True
+    else:
+        _token_ok_cache[token_id] = True
+    return blacklisted
+
 
-async def _load_user_from_db(db: asyncpg.Connection, user_id: str) -> Optional[Dict[str, Any]]:
+async def _load_user_from_db(db: asyncpg.Connection, user_id: uuid.UUID) -> Optional[asyncpg.Record]:
     """
     Load user data from database
 
@@ -126,94 +291,118 @@ async def _load_user_from_db(db: asyncpg.Connection, user_id: str) -> Optional[D
         user_id: User UUID to load
 
     Returns:
-        User data dictionary or None if not found
+        User record or None if not found
     """
     try:
-        result = await db.fetchrow("""
-            SELECT id, email, created_at, updated_at, aa_account_id
-            FROM users 
-            WHERE id = $1
-        """, user_id)
-
-        if not result:
-            return None
-
-        return {
-            "id": str(result["id"]),
-            "email": result["email"],
-            "created_at": result["created_at"],
-            "updated_at": result["updated_at"],
-            "aa_account_id": result.get("aa_account_id")
-        }
+        statement = await prepared(db, _LOAD_USER_SQL)
+        return await statement.fetchrow(user_id)
 
     except Exception as e:
-        logger.error(f"User lookup failed for {user_id}: {e}")
+        logger.error("User lookup failed for %s: %s", user_id, e)
         return None
 
 
-async def get_current_user(
-    request: Request,
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: asyncpg.Connection = Depends(get_db)
-) -> AuthenticatedUser:
+async def _load_auth_context(
+    db: asyncpg.Connection,
+    token_id: str,
+    user_id: uuid.UUID
+) -> Tuple[bool, Optional[asyncpg.Record]]:
     """
-    FastAPI dependency to get the current authenticated user
-
-    Validates JWT token, checks blacklist, loads user data, and attaches to request state.
+    Check the token blacklist and load the user in a single query
 
     Args:
-        request: FastAPI request object
-        credentials: HTTP Bearer credentials
         db: Database connection
+        token_id: JWT token ID to check
+        user_id: User UUID to load
 
     Returns:
-        AuthenticatedUser instance with user data and token info
-
-    Raises:
-        HTTPException: 401 if authentication fails
+        (blacklisted, user record or None if not found)
     """
-    # Check if credentials are provided
-    if not credentials:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Authentication required",
-            headers={"WWW-Authenticate": "Bearer"},
+    # A cached blacklist result leaves only the user to load
+    if token_id in _token_blacklisted_cache:
+        return True, None
+    if token_id in _token_ok_cache:
+        return False, await _load_user_from_db(db, user_id)
+
+    try:
+        # Revocations from other workers show up in Redis; check it alongside the query
+        statement = await prepared(db, _AUTH_CONTEXT_SQL)
+        in_redis, result = await asyncio.gather(
+            _redis_blacklisted(token_id),
+            statement.fetchrow(token_id, user_id)
         )
 
+    except Exception as e:
+        logger.error("Auth lookup failed for %s: %s", user_id, e)
+        return False, None
+
+    if in_redis:
+        _token_blacklisted_cache[token_id] = True
+        return True, None
+
+    if not result:
+        return False, None
+
+    if result["blacklisted"]:
+        _token_blacklisted_cache[token_id] = True
+        return True, None
+
+    _token_ok_cache[token_id] = True
+    return False, result
+
+
+async def _resolve_user(
+    request: Request,
+    token: Optional[str],
+    db: Optional[asyncpg.Connection]
+) -> Union[AuthenticatedUser, str]:
+    """
+    Authenticate the request without raising
+
+    Validates JWT token, checks blacklist, loads user data, and attaches to request state.
+
+    Returns:
+        AuthenticatedUser on success, otherwise the 401 detail message
+    """
+    # Check if a token is provided
+    if not token:
+        return "Authentication required"
+
+    # Reject obviously malformed tokens without touching the crypto path
+    if not (_JWT_MIN_LENGTH < len(token) < _JWT_MAX_LENGTH) or not _JWT_RE.fullmatch(token):
+        return "Invalid token format"
+
     try:
         # Decode and validate JWT token
-        token_payload = decode_token(credentials.credentials)
+        try:
+            token_payload = _decode_cached(token)
+        except HTTPException as e:
+            return e.detail
+
         user_id = token_payload.get("sub")
         token_id = token_payload.get("jti")
 
         if not user_id or not token_id:
             logger.warning("Token missing required claims (sub or jti)")
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid token format",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
+            return "Invalid token format"
 
-        # Check if token is blacklisted (if database is available)
-        if db and await _is_token_blacklisted(db, token_id):
-            logger.warning(f"Blacklisted token used: {token_id}")
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Token has been revoked",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
-
-        # Load user data from database
+        # Check the blacklist and load user data from database in one query
         user_data = None
         if db:
-            user_data = await _load_user_from_db(db, user_id)
+            # Bind a native UUID so asyncpg uses the binary codec
+            try:
+                user_uuid = uuid.UUID(user_id)
+            except (TypeError, ValueError):
+                logger.warning("Token subject is not a valid user ID: %s", user_id)
+                return "Invalid token format"
+
+            blacklisted, user_data = await _load_auth_context(db, token_id, user_uuid)
+            if blacklisted:
+                logger.warning("Blacklisted token used: %s", token_id)
+                return "Token has been revoked"
             if not user_data:
-                logger.warning(f"User not found in database: {user_id}")
-                raise HTTPException(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail="User not found",
-                    headers={"WWW-Authenticate": "Bearer"},
-                )
+                logger.warning("User not found in database: %s", user_id)
+                return "User not found"
         else:
             # Development mode - create mock user data
             logger.info("Development mode: Using mock user data")
@@ -221,34 +410,57 @@ async def get_current_user(
                 "id": user_id,
                 "email": token_payload.get("email", "dev@example.com"),
                 "created_at": datetime.utcnow(),
-                "updated_at": datetime.utcnow(),
                 "aa_account_id": None
             }
 
-        # Create authenticated user instance
-        authenticated_user = AuthenticatedUser(user_data, token_payload)
+        # Create authenticated user instance straight from the record
+        authenticated_user = AuthenticatedUser.from_row(user_data, token_payload)
 
         # Attach user to request state for easy access in route handlers
         request.state.user = authenticated_user
 
-        logger.debug(f"Authentication successful: {authenticated_user}")
+        logger.debug("Authentication successful: %s", authenticated_user)
         return authenticated_user
 
-    except HTTPException:
-        # Re-raise HTTP exceptions (already have proper status/detail)
-        raise
     except Exception as e:
-        logger.error(f"Authentication failed: {e}")
+        logger.error("Authentication failed: %s", e)
+        return "Authentication failed"
+
+
+async def get_current_user(
+    request: Request,
+    token: Optional[str] = Depends(_bearer),
+    db: asyncpg.Connection = Depends(get_db)
+) -> AuthenticatedUser:
+    """
+    FastAPI dependency to get the current authenticated user
+
+    Validates JWT token, checks blacklist, loads user data, and attaches to request state.
+
+    Args:
+        request: FastAPI request object
+        token: Bearer token from the Authorization header
+        db: Database connection
+
+    Returns:
+        AuthenticatedUser instance with user data and token info
+
+    Raises:
+        HTTPException: 401 if authentication fails
+    """
+    result = await _resolve_user(request, token, db)
+    if isinstance(result, str):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Authentication failed",
+            detail=result,
             headers={"WWW-Authenticate": "Bearer"},
         )
+    return result
 
 
 async def get_optional_user(
     request: Request,
-    credentials: HTTPAuthorizationCredentials = Depends(security),
+    token: Optional[str] = Depends(_bearer),
     db: asyncpg.Connection = Depends(get_db)
 ) -> Optional[AuthenticatedUser]:
     """
@@ -259,20 +471,18 @@ async def get_optional_user(
 
     Args:
         request: FastAPI request object
-        credentials: HTTP Bearer credentials (optional)
+        token: Bearer token from the Authorization header (optional)
         db: Database connection
 
     Returns:
         AuthenticatedUser instance if authenticated, None otherwise
     """
-    if not credentials:
+    if not token:
         return None
 
-    try:
-        return await get_current_user(request, credentials, db)
-    except HTTPException:
-        # If authentication fails, return None instead of raising
-        return None
+    # Failures come back as a detail string; no HTTPException is raised and caught
+    result = await _resolve_user(request, token, db)
+    return None if isinstance(result, str) else result
 
 
 def require_user() -> Callable:
@@ -320,6 +530,10 @@ __all__ = [
     "get_optional_user",
     "require_user",
     "require_admin",
+    "invalidate_token",
+    "blacklist_token",
+    "start_revocation_listener",
+    "stop_revocation_listener",
     "AuthDep",
     "OptionalAuthDep"
 ]
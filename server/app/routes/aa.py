@@ -5,20 +5,21 @@ Handles AA consent flow, webhooks, transaction sync, and account management.
 Provides endpoints for the complete AA integration workflow from consent to transaction sync.
 """
 
-import json
+import asyncio
 import uuid
 import logging
 import hashlib
 import hmac
-from datetime import datetime, timedelta
+import ssl
+from datetime import datetime
 from typing import List, Optional, Dict, Any
-from decimal import Decimal
 
 import asyncpg
+import orjson
 from fastapi import APIRouter, Depends, HTTPException, Query, Request, BackgroundTasks
 from fastapi.responses import JSONResponse
 
-from app.database import get_db
+from app.database import get_db, prepared, register_hot_query
 from app.deps.auth import get_current_user, AuthenticatedUser
 from app.config import AA_MOCK_WEBHOOK_SECRET
 from app.services.aa_client import aa_client
@@ -33,6 +34,61 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/aa", tags=["Account Aggregator"])
 
+# Webhook HMACs go through OpenSSL's SHA-256, which uses the CPU's SHA extensions from 1.1.1 on
+if ssl.OPENSSL_VERSION_INFO < (1, 1, 1):
+    raise RuntimeError(f"OpenSSL 1.1.1 or newer is required for webhook verification, found {ssl.OPENSSL_VERSION}")
+logger.info(f"Webhook signatures verified with {ssl.OPENSSL_VERSION}")
+
+# Keyed once at import; each webhook copies it instead of re-encoding and re-keying the secret
+_WEBHOOK_MAC = (
+    hmac.new(AA_MOCK_WEBHOOK_SECRET.encode('utf-8'), digestmod=hashlib.sha256)
+    if AA_MOCK_WEBHOOK_SECRET else None
+)
+
+# AA webhooks carry a single transaction; anything larger is rejected unread
+MAX_WEBHOOK_BODY_BYTES = 64 * 1024
+
+# Concurrent AA fetches per manual sync
+SYNC_FETCH_CONCURRENCY = 5
+
+# Statements on the webhook and sync paths, prepared once per pool connection.
+# Amounts are bound as float8 and rounded to numeric(15,2) by Postgres, so no Decimal is built per row
+_LOOKUP_ACCOUNT_SQL = register_hot_query("""
+            SELECT user_id, display_name 
+            FROM aa_accounts 
+            WHERE aa_account_id = $1
+        """)
+
+_INSERT_TX_SQL = register_hot_query("""
+            INSERT INTO transactions (
+                bank_transaction_id, user_id, ts, amount, type, 
+                raw_desc, account_id, created_at, updated_at
+            ) VALUES ($1, $2, $3, $4::float8::numeric(15,2), $5, $6, $7, $8, $8)
+            ON CONFLICT ON CONSTRAINT uq_tx_user_bank DO NOTHING
+            RETURNING id
+        """)
+
+_INSERT_TX_BATCH_SQL = register_hot_query("""
+            INSERT INTO transactions (
+                bank_transaction_id, user_id, ts, amount, type,
+                raw_desc, account_id, created_at, updated_at
+            )
+            SELECT t.bank_transaction_id, $6::uuid, t.ts, t.amount::numeric(15,2), t.type,
+                   t.raw_desc, $7, $8, $8
+            FROM unnest(
+                $1::text[], $2::timestamptz[], $3::float8[],
+                $4::transaction_type[], $5::text[]
+            ) AS t(bank_transaction_id, ts, amount, type, raw_desc)
+            ON CONFLICT ON CONSTRAINT uq_tx_user_bank DO NOTHING
+            RETURNING id
+        """)
+
+_INSERT_WEBHOOK_LOG_SQL = register_hot_query("""
+            INSERT INTO aa_sync_logs (
+                user_id, start_ts, end_ts, status, inserted_count, created_at
+            ) VALUES ($1, $2, $2, $3, 1, $2)
+        """)
+
 
 # Helper function to enqueue categorization jobs
 async def enqueue_categorize_job(tx_id: str) -> bool:
@@ -53,6 +109,44 @@ async def enqueue_categorize_job(tx_id: str) -> bool:
         return False
 
 
+def enqueue_categorize_batch_job(tx_ids: List[str]) -> bool:
+    """
+    Enqueue one priority categorization job for a batch of transactions
+
+    Args:
+        tx_ids: Transaction IDs to categorize
+
+    Returns:
+        bool: True if successfully enqueued
+    """
+    try:
+        from app.utils.enqueue_categorize import enqueue_categorize_batch
+        return enqueue_categorize_batch(tx_ids, priority=True)
+    except Exception as e:
+        logger.error(f"Failed to enqueue categorization job for {len(tx_ids)} transactions: {e}")
+        return False
+
+
+def _parse_tx_ts(ts: Any) -> datetime:
+    """Parse an AA transaction timestamp (ISO string or datetime)"""
+    if isinstance(ts, str):
+        return datetime.fromisoformat(ts.replace('Z', '+00:00'))
+    return ts
+
+
+async def _fetch_account_transactions(
+    account: asyncpg.Record,
+    semaphore: asyncio.Semaphore
+) -> List[Dict[str, Any]]:
+    """Fetch an account's new transactions from the AA client, bounded by semaphore"""
+    async with semaphore:
+        return await aa_client.fetch_transactions(
+            account_id=account["aa_account_id"],
+            since_ts=account["since_ts"],
+            limit=500
+        )
+
+
 @router.post("/consent/start", response_model=ConsentStartOut)
 async def start_consent(
     user: AuthenticatedUser = Depends(get_current_user),
@@ -130,29 +224,22 @@ async def get_consent_status(
         HTTPException: 404 if consent not found, 403 if not owned by user
     """
     try:
-        # Verify consent belongs to user
-        consent_row = await db.fetchrow("""
-            SELECT id, ref_id, status, created_at, updated_at, last_polled_at
-            FROM aa_consents 
-            WHERE user_id = $1 AND ref_id = $2
-        """, user.id, ref_id)
-
-        if not consent_row:
-            raise HTTPException(
-                status_code=404,
-                detail="Consent not found or not owned by user"
-            )
-
         # Poll AA client for latest status
         current_status = await aa_client.poll_consent_status(ref_id)
 
-        # Update database with latest status
+        # Update database with latest status; the user_id filter doubles as the ownership check
         updated_row = await db.fetchrow("""
             UPDATE aa_consents 
             SET status = $1, last_polled_at = $2, updated_at = $2
-            WHERE id = $3
+            WHERE user_id = $3 AND ref_id = $4
             RETURNING id, ref_id, status, created_at, updated_at, last_polled_at
-        """, current_status, datetime.utcnow(), consent_row["id"])
+        """, current_status, datetime.utcnow(), user.id, ref_id)
+
+        if not updated_row:
+            raise HTTPException(
+                status_code=404,
+                detail="Consent not found or not owned by user"
+            )
 
         logger.info(f"Consent {ref_id} status: {current_status}")
 
@@ -203,8 +290,8 @@ async def aa_webhook(
         dict: Success/error status with processing details
     """
     try:
-        # Get request body and headers
-        body = await request.body()
+        # Get request body (bounded) and headers
+        body = await _read_webhook_body(request)
         signature = request.headers.get("X-AA-Signature", "")
 
         # Verify webhook signature
@@ -217,8 +304,8 @@ async def aa_webhook(
 
         # Parse webhook payload
         try:
-            payload = json.loads(body.decode('utf-8'))
-        except json.JSONDecodeError:
+            payload = orjson.loads(body)
+        except orjson.JSONDecodeError:
             raise HTTPException(
                 status_code=400,
                 detail="Invalid JSON payload"
@@ -235,11 +322,8 @@ async def aa_webhook(
             )
 
         # Find the user who owns this AA account
-        account_row = await db.fetchrow("""
-            SELECT user_id, display_name 
-            FROM aa_accounts 
-            WHERE aa_account_id = $1
-        """, account_id)
+        lookup_account = await prepared(db, _LOOKUP_ACCOUNT_SQL)
+        account_row = await lookup_account.fetchrow(account_id)
 
         if not account_row:
             logger.warning(f"Webhook for unknown account: {account_id}")
@@ -266,34 +350,20 @@ async def aa_webhook(
         else:
             tx_timestamp = datetime.utcnow()
 
-        # Insert transaction idempotently
-        existing_tx = await db.fetchval("""
-            SELECT id FROM transactions 
-            WHERE bank_transaction_id = $1
-        """, tx_id)
+        # Insert transaction idempotently; a duplicate returns no id
+        insert_tx = await prepared(db, _INSERT_TX_SQL)
+        new_tx_id = await insert_tx.fetchval(
+            tx_id, user_id, tx_timestamp, float(tx_amount),
+            tx_type, tx_desc, account_id, datetime.utcnow()
+        )
 
-        if existing_tx:
+        if new_tx_id is None:
             logger.info(f"Transaction {tx_id} already exists, skipping")
             return {"status": "duplicate", "transaction_id": tx_id}
 
-        # Insert new transaction
-        new_tx_id = await db.fetchval("""
-            INSERT INTO transactions (
-                bank_transaction_id, user_id, ts, amount, type, 
-                raw_desc, account_id, created_at, updated_at
-            ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $8)
-            RETURNING id
-        """, 
-            tx_id, user_id, tx_timestamp, Decimal(str(tx_amount)),
-            tx_type, tx_desc, account_id, datetime.utcnow()
-        )
-
         # Log webhook processing
-        await db.execute("""
-            INSERT INTO aa_sync_logs (
-                user_id, start_ts, end_ts, status, inserted_count, created_at
-            ) VALUES ($1, $2, $2, $3, 1, $2)
-        """, user_id, datetime.utcnow(), AASyncStatus.COMPLETED)
+        insert_log = await prepared(db, _INSERT_WEBHOOK_LOG_SQL)
+        await insert_log.fetchval(user_id, datetime.utcnow(), AASyncStatus.COMPLETED)
 
         # Enqueue categorization job in background
         background_tasks.add_task(enqueue_categorize_job, str(new_tx_id))
@@ -339,11 +409,14 @@ async def sync_transactions(
     sync_start = datetime.utcnow()
     total_inserted = 0
     results = []
+    new_tx_ids = []
+    sync_logs = []
 
     try:
         # Get user's linked AA accounts
         accounts = await db.fetch("""
-            SELECT id, aa_account_id, display_name, last_sync_at
+            SELECT id, aa_account_id, display_name,
+                   COALESCE(last_sync_at, NOW() - INTERVAL '30 days') AS since_ts
             FROM aa_accounts 
             WHERE user_id = $1
             ORDER BY created_at DESC
@@ -357,57 +430,40 @@ async def sync_transactions(
 
         logger.info(f"Starting sync for user {user.id}, {len(accounts)} accounts")
 
+        # Fetch every account from the AA client concurrently; DB writes stay serial below
+        fetch_semaphore = asyncio.Semaphore(SYNC_FETCH_CONCURRENCY)
+        fetched = await asyncio.gather(
+            *(_fetch_account_transactions(account, fetch_semaphore) for account in accounts),
+            return_exceptions=True
+        )
+
         # Process each account
-        for account in accounts:
+        for account, transactions in zip(accounts, fetched):
             account_id = account["aa_account_id"]
-            last_sync = account["last_sync_at"] or (datetime.utcnow() - timedelta(days=30))
-
-            # Create sync log entry
-            sync_log_id = await db.fetchval("""
-                INSERT INTO aa_sync_logs (
-                    user_id, account_id, start_ts, status, created_at
-                ) VALUES ($1, $2, $3, $4, $3)
-                RETURNING id
-            """, user.id, account["id"], sync_start, AASyncStatus.RUNNING)
 
             try:
-                # Fetch transactions from AA client
-                transactions = await aa_client.fetch_transactions(
-                    account_id=account_id,
-                    since_ts=last_sync,
-                    limit=500
-                )
-
-                inserted_count = 0
-                duplicate_count = 0
-
-                # Process each transaction
-                for tx in transactions:
-                    # Check if transaction already exists
-                    existing = await db.fetchval("""
-                        SELECT id FROM transactions 
-                        WHERE bank_transaction_id = $1
-                    """, tx["id"])
-
-                    if existing:
-                        duplicate_count += 1
-                        continue
-
-                    # Insert new transaction
-                    new_tx_id = await db.fetchval("""
-                        INSERT INTO transactions (
-                            bank_transaction_id, user_id, ts, amount, type,
-                            raw_desc, account_id, created_at, updated_at
-                        ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $8)
-                        RETURNING id
-                    """,
-                        tx["id"], user.id, tx["ts"], Decimal(str(tx["amount"])),
-                        tx["type"], tx["raw_desc"], account_id, datetime.utcnow()
+                # A failed fetch is reported against its own account; a cancelled
+                # one (a BaseException) is re-raised and cancels the sync
+                if isinstance(transactions, BaseException):
+                    raise transactions
+
+                # Insert the whole batch in one statement; duplicates are skipped
+                inserted_rows = []
+                if transactions:
+                    insert_batch = await prepared(db, _INSERT_TX_BATCH_SQL)
+                    inserted_rows = await insert_batch.fetch(
+                        [tx["id"] for tx in transactions],
+                        [_parse_tx_ts(tx["ts"]) for tx in transactions],
+                        [float(tx["amount"]) for tx in transactions],
+                        [tx["type"] for tx in transactions],
+                        [tx["raw_desc"] for tx in transactions],
+                        user.id, account_id, datetime.utcnow()
                     )
 
-                    # Enqueue categorization job
-                    background_tasks.add_task(enqueue_categorize_job, str(new_tx_id))
-                    inserted_count += 1
+                inserted_count = len(inserted_rows)
+                duplicate_count = len(transactions) - inserted_count
+
+                new_tx_ids.extend(str(row["id"]) for row in inserted_rows)
 
                 # Update account last sync timestamp
                 await db.execute("""
@@ -416,12 +472,11 @@ async def sync_transactions(
                     WHERE id = $2
                 """, sync_start, account["id"])
 
-                # Mark sync log as completed
-                await db.execute("""
-                    UPDATE aa_sync_logs 
-                    SET end_ts = $1, status = $2, inserted_count = $3, updated_at = $1
-                    WHERE id = $4
-                """, datetime.utcnow(), AASyncStatus.COMPLETED, inserted_count, sync_log_id)
+                # Record the completed sync log
+                sync_logs.append((
+                    user.id, account["id"], sync_start, datetime.utcnow(),
+                    AASyncStatus.COMPLETED, inserted_count, None
+                ))
 
                 total_inserted += inserted_count
 
@@ -440,12 +495,11 @@ async def sync_transactions(
                 error_msg = f"Sync failed for account {account_id}: {str(e)}"
                 logger.error(error_msg)
 
-                # Mark sync log as failed
-                await db.execute("""
-                    UPDATE aa_sync_logs 
-                    SET end_ts = $1, status = $2, error_text = $3, updated_at = $1
-                    WHERE id = $4
-                """, datetime.utcnow(), AASyncStatus.FAILED, error_msg, sync_log_id)
+                # Record the failed sync log
+                sync_logs.append((
+                    user.id, account["id"], sync_start, datetime.utcnow(),
+                    AASyncStatus.FAILED, 0, error_msg
+                ))
 
                 results.append({
                     "account_id": account_id,
@@ -455,6 +509,18 @@ async def sync_transactions(
                     "inserted_count": 0
                 })
 
+        # Sync logs are written once, with their final status
+        await db.executemany("""
+            INSERT INTO aa_sync_logs (
+                user_id, account_id, start_ts, end_ts, status,
+                inserted_count, error_text, created_at, updated_at
+            ) VALUES ($1, $2, $3, $4, $5, $6, $7, $3, $4)
+        """, sync_logs)
+
+        # One categorization job for the whole sync, ahead of scheduled work
+        if new_tx_ids:
+            background_tasks.add_task(enqueue_categorize_batch_job, new_tx_ids)
+
         sync_duration = (datetime.utcnow() - sync_start).total_seconds()
 
         logger.info(f"Sync completed for user {user.id}: {total_inserted} transactions in {sync_duration:.1f}s")
@@ -573,6 +639,32 @@ async def list_sync_logs(
         )
 
 
+async def _read_webhook_body(request: Request) -> bytes:
+    """
+    Read the webhook body, refusing anything over MAX_WEBHOOK_BODY_BYTES
+
+    Content-Length is checked up front; chunked bodies are cut off while streaming.
+
+    Raises:
+        HTTPException: 413 if the body is too large
+    """
+    too_large = HTTPException(status_code=413, detail="Webhook payload too large")
+
+    try:
+        content_length = int(request.headers.get("content-length", 0))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid Content-Length header")
+    if content_length > MAX_WEBHOOK_BODY_BYTES:
+        raise too_large
+
+    body = bytearray()
+    async for chunk in request.stream():
+        body += chunk
+        if len(body) > MAX_WEBHOOK_BODY_BYTES:
+            raise too_large
+    return bytes(body)
+
+
 def _verify_webhook_signature(body: bytes, signature: str) -> bool:
     """
     Verify webhook signature for security
@@ -587,7 +679,7 @@ def _verify_webhook_signature(body: bytes, signature: str) -> bool:
     Returns:
         bool: True if signature is valid
     """
-    if not AA_MOCK_WEBHOOK_SECRET or not signature:
+    if _WEBHOOK_MAC is None or not signature:
         logger.warning("Webhook signature verification skipped (no secret configured)")
         return True  # Allow webhooks in development
 
@@ -598,12 +690,9 @@ def _verify_webhook_signature(body: bytes, signature: str) -> bool:
 
         expected_signature = signature[7:]  # Remove "sha256=" prefix
 
-        # Generate signature
-        mac = hmac.new(
-            AA_MOCK_WEBHOOK_SECRET.encode('utf-8'),
-            body,
-            hashlib.sha256
-        )
+        # Generate signature from the pre-keyed state
+        mac = _WEBHOOK_MAC.copy()
+        mac.update(body)
         computed_signature = mac.hexdigest()
 
         # Secure comparison
@@ -13,6 +13,7 @@ import logging
 from app.database import get_db
 from app.workers.aa_worker import enqueue_aa_sync, AAWorker
 from app.scheduler.aa_scheduler import AAScheduler
+from app.utils.enqueue_categorize import CATEGORIZE_QUEUE, CATEGORIZE_PRIORITY_QUEUE
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -22,6 +23,37 @@ _aa_worker_instance = None
 _aa_scheduler_instance = None
 
 
+async def _get_aa_worker() -> AAWorker:
+    """Shared AAWorker for admin endpoints, connected on first use"""
+    global _aa_worker_instance
+    if _aa_worker_instance is None:
+        worker = AAWorker()
+        await worker.connect()
+        _aa_worker_instance = worker
+    return _aa_worker_instance
+
+
+async def _get_aa_scheduler() -> AAScheduler:
+    """Shared AAScheduler for admin endpoints, connected on first use"""
+    global _aa_scheduler_instance
+    if _aa_scheduler_instance is None:
+        scheduler = AAScheduler()
+        await scheduler.connect()
+        _aa_scheduler_instance = scheduler
+    return _aa_scheduler_instance
+
+
+async def close_admin_clients():
+    """Close the shared worker and scheduler Redis connections (called on shutdown)"""
+    global _aa_worker_instance, _aa_scheduler_instance
+    if _aa_worker_instance is not None:
+        await _aa_worker_instance.stop()
+        _aa_worker_instance = None
+    if _aa_scheduler_instance is not None:
+        await _aa_scheduler_instance.redis_client.close()
+        _aa_scheduler_instance = None
+
+
 @router.post("/admin/aa/enqueue-sync")
 async def enqueue_sync_endpoint(
     user_id: str = Query(..., description="User ID"),
@@ -77,12 +109,9 @@ async def enqueue_sync_endpoint(
 async def get_worker_stats():
     """Get AA worker statistics"""
     try:
-        # Create temporary worker instance to get stats
-        worker = AAWorker()
-        await worker.connect()
+        worker = await _get_aa_worker()
 
         stats = await worker.get_stats()
-        await worker.stop()
 
         return {
             "message": "AA worker statistics",
@@ -101,11 +130,9 @@ async def get_worker_stats():
 async def get_scheduler_stats():
     """Get AA scheduler statistics"""
     try:
-        scheduler = AAScheduler()
-        await scheduler.connect()
+        scheduler = await _get_aa_scheduler()
 
         stats = await scheduler.get_scheduler_stats()
-        await scheduler.redis_client.close()
 
         return {
             "message": "AA scheduler statistics",
@@ -124,11 +151,9 @@ async def get_scheduler_stats():
 async def trigger_scheduler_run():
     """Manually trigger a scheduler run"""
     try:
-        scheduler = AAScheduler()
-        await scheduler.connect()
+        scheduler = await _get_aa_scheduler()
 
         result = await scheduler.schedule_account_syncs()
-        await scheduler.redis_client.close()
 
         return {
             "message": "Scheduler run completed",
@@ -144,17 +169,23 @@ async def trigger_scheduler_run():
 async def get_queue_status():
     """Get status of all AA-related queues"""
     try:
-        worker = AAWorker()
-        await worker.connect()
-
-        # Get queue sizes
-        main_queue_size = await worker.redis_client.llen("aa_sync")
-        retry_queue_size = await worker.redis_client.llen("aa_sync_retry")
-        dlq_size = await worker.redis_client.llen("aa_dlq")
-        completed_size = await worker.redis_client.llen("aa_sync_completed")
-        failed_size = await worker.redis_client.llen("aa_sync_failed")
-
-        await worker.stop()
+        worker = await _get_aa_worker()
+
+        # Get queue sizes in one round trip
+        async with worker.redis_client.pipeline() as pipe:
+            (
+                main_queue_size, retry_queue_size, dlq_size, completed_size, failed_size,
+                categorize_size, categorize_priority_size
+            ) = await (
+                pipe.llen("aa_sync")
+                .llen("aa_sync_retry")
+                .llen("aa_dlq")
+                .llen("aa_sync_completed")
+                .llen("aa_sync_failed")
+                .llen(f"rq:queue:{CATEGORIZE_QUEUE}")
+                .llen(f"rq:queue:{CATEGORIZE_PRIORITY_QUEUE}")
+                .execute()
+            )
 
         return {
             "message": "Queue status",
@@ -163,7 +194,9 @@ async def get_queue_status():
                 "retry_queue": retry_queue_size,
                 "dead_letter_queue": dlq_size,
                 "completed_jobs": completed_size,
-                "failed_jobs": failed_size
+                "failed_jobs": failed_size,
+                "categorize_queue": categorize_size,
+                "categorize_priority_queue": categorize_priority_size
             },
             "total_pending": main_queue_size + retry_queue_size
         }
@@ -177,17 +210,18 @@ async def get_queue_status():
 async def clear_queues():
     """Clear all AA sync queues (for development/testing)"""
     try:
-        worker = AAWorker()
-        await worker.connect()
-
-        # Clear all queues
-        await worker.redis_client.delete("aa_sync")
-        await worker.redis_client.delete("aa_sync_retry")
-        await worker.redis_client.delete("aa_dlq")
-        await worker.redis_client.delete("aa_sync_completed")
-        await worker.redis_client.delete("aa_sync_failed")
-
-        await worker.stop()
+        worker = await _get_aa_worker()
+
+        # Clear all queues in one round trip
+        async with worker.redis_client.pipeline() as pipe:
+            await (
+                pipe.delete("aa_sync")
+                .delete("aa_sync_retry")
+                .delete("aa_dlq")
+                .delete("aa_sync_completed")
+                .delete("aa_sync_failed")
+                .execute()
+            )
 
         logger.info("🧹 Cleared all AA sync queues")
 
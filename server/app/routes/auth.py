@@ -18,10 +18,11 @@ from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from pydantic import BaseModel, Field, EmailStr
 
 from app.database import get_db
+from app.deps.auth import blacklist_token
 from app.security import (
     hash_password, verify_password,
     create_access_token, create_refresh_token,
-    decode_token, extract_user_id_from_token, extract_token_id_from_token,
+    decode_token, extract_user_id_from_token,
     generate_token_id
 )
 from app.services.firebase_admin import create_custom_token, initialize_firebase
@@ -608,6 +609,7 @@ async def refresh_tokens(
         await db.execute("""
             DELETE FROM session_tokens WHERE token_id = $1
         """, token_id)
+        await blacklist_token(token_id, payload["exp"], db)
 
         # Generate new tokens
         token_data = {"sub": str(user["id"]), "email": user["email"]}
@@ -670,8 +672,9 @@ async def logout_user(
     logger.info(f"🚪 Logout request for user: {current_user['email']}")
 
     try:
-        # Extract token ID from current token
-        current_token_id = extract_token_id_from_token(credentials.credentials)
+        # Extract token ID and expiry from current token
+        current_payload = decode_token(credentials.credentials)
+        current_token_id = current_payload.get("jti")
 
         if not db:
             # Development mode
@@ -683,6 +686,9 @@ async def logout_user(
 
         # Revoke all user tokens
         revoked_count = await revoke_user_tokens(db, current_user["id"])
+        # Tokens without a jti can't be looked up by ID, so there is nothing to blacklist
+        if current_token_id:
+            await blacklist_token(current_token_id, current_payload["exp"], db)
 
         logger.info(f"✅ Logout successful for user: {current_user['email']}, revoked {revoked_count} tokens")
 
@@ -385,8 +385,8 @@ async def generate_transactions(
                 try:
                     # Check if transaction already exists
                     existing = await db.fetchval(
-                        "SELECT id FROM transactions WHERE bank_transaction_id = $1",
-                        tx["id"]
+                        "SELECT id FROM transactions WHERE bank_transaction_id = $1 AND user_id = $2",
+                        tx["id"], user.id
                     )
 
                     if not existing:
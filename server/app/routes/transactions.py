@@ -115,8 +115,9 @@ async def sync_transactions(
         for transaction in transactions:
             try:
                 # Check if transaction already exists
+                # Unauthenticated rows carry no user_id, so scope to those
                 existing = await db.fetchrow(
-                    "SELECT id FROM transactions WHERE bank_transaction_id = $1",
+                    "SELECT id FROM transactions WHERE bank_transaction_id = $1 AND user_id IS NULL",
                     transaction.id
                 )
 
@@ -125,17 +126,18 @@ async def sync_transactions(
                     await db.execute("""
                         UPDATE transactions 
                         SET amount = $2, raw_desc = $3, updated_at = $4
-                        WHERE bank_transaction_id = $1
-                    """, transaction.id, transaction.amount, transaction.raw_desc, datetime.utcnow())
+                        WHERE id = $1
+                    """, existing["id"], transaction.amount, transaction.raw_desc, datetime.utcnow())
                     updated_count += 1
                     logger.debug(f"📝 Updated transaction: {transaction.id}")
                 else:
                     # Insert new transaction
-                    await db.execute("""
+                    new_tx_id = await db.fetchval("""
                         INSERT INTO transactions (
                             bank_transaction_id, ts, amount, type, raw_desc, account_id,
                             created_at, updated_at
                         ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8)
+                        RETURNING id
                     """, 
                     transaction.id, transaction.ts, transaction.amount, 
                     transaction.type.value, transaction.raw_desc, transaction.account_id,
@@ -145,7 +147,7 @@ async def sync_transactions(
                     logger.debug(f"➕ Inserted transaction: {transaction.id}")
 
                     # Enqueue categorization job for new transactions
-                    await enqueue_categorize(transaction.id)
+                    await enqueue_categorize(str(new_tx_id))
 
             except Exception as e:
                 error_count += 1
@@ -254,7 +256,7 @@ async def transaction_webhook(
     try:
         # Check if transaction already exists
         existing = await db.fetchrow(
-            "SELECT id FROM transactions WHERE bank_transaction_id = $1",
+            "SELECT id FROM transactions WHERE bank_transaction_id = $1 AND user_id IS NULL",
             transaction.id
         )
 
@@ -267,11 +269,12 @@ async def transaction_webhook(
             }
 
         # Insert new transaction
-        await db.execute("""
+        new_tx_id = await db.fetchval("""
             INSERT INTO transactions (
                 bank_transaction_id, ts, amount, type, raw_desc, account_id,
                 created_at, updated_at
             ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8)
+            RETURNING id
         """, 
         transaction.id, transaction.ts, transaction.amount, 
         transaction.type.value, transaction.raw_desc, transaction.account_id,
@@ -280,7 +283,7 @@ async def transaction_webhook(
         logger.info(f"✅ Webhook transaction inserted: {transaction.id}")
 
         # Enqueue categorization job in background
-        background_tasks.add_task(enqueue_categorize, transaction.id)
+        background_tasks.add_task(enqueue_categorize, str(new_tx_id))
 
         return {
             "status": "success",
@@ -20,7 +20,7 @@ import redis.asyncio as redis
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.interval import IntervalTrigger
 
-from app.database import db_pool
+from app.database import get_db_pool
 from app.workers.aa_worker import enqueue_aa_sync
 
 logger = logging.getLogger(__name__)
@@ -62,6 +62,7 @@ class AAScheduler:
         Returns:
             List of account dictionaries that need syncing
         """
+        db_pool = get_db_pool()
         if not db_pool:
             logger.error("Database pool not available")
             return []
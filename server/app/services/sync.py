@@ -112,7 +112,8 @@ async def upsert_transaction(
     try:
         # Use provided connection or get a new one
         if db is None:
-            from app.database import db_pool
+            from app.database import get_db_pool
+            db_pool = get_db_pool()
             if not db_pool:
                 logger.warning("No database connection available")
                 return "skipped"
@@ -137,8 +138,9 @@ async def _perform_upsert(
 
     # Check if transaction already exists by tx_hash (our dedup key)
     existing = await conn.fetchrow(
-        "SELECT id FROM transactions WHERE bank_transaction_id = $1",
-        tx_hash  # Use our normalized hash as the bank_transaction_id
+        "SELECT id FROM transactions WHERE bank_transaction_id = $1 AND user_id = $2",
+        tx_hash,  # Use our normalized hash as the bank_transaction_id
+        user_id
     )
 
     if existing:
@@ -230,7 +232,8 @@ async def sync_account(
     try:
         # Use provided connection or get a new one
         if db is None:
-            from app.database import db_pool
+            from app.database import get_db_pool
+            db_pool = get_db_pool()
             if not db_pool:
                 logger.warning("No database connection available")
                 return {"status": "failed", "error": "No database", "inserted_count": 0, "skipped_count": 0, "error_count": 1}
@@ -291,7 +294,7 @@ async def _perform_sync(
                 if result == "inserted":
                     inserted_count += 1
                     # Enqueue for categorization
-                    tx_id = await _get_transaction_id_by_hash(conn, normalize_tx_id({**tx, 'user_id': user_id}))
+                    tx_id = await _get_transaction_id_by_hash(conn, user_id, normalize_tx_id({**tx, 'user_id': user_id}))
                     if tx_id:
                         await enqueue_categorize(tx_id)
                 elif result == "skipped":
@@ -343,12 +346,12 @@ async def _perform_sync(
         raise
 
 
-async def _get_transaction_id_by_hash(conn: asyncpg.Connection, tx_hash: str) -> Optional[str]:
-    """Get transaction UUID by normalized hash."""
+async def _get_transaction_id_by_hash(conn: asyncpg.Connection, user_id: str, tx_hash: str) -> Optional[str]:
+    """Get the user's transaction UUID by normalized hash."""
     try:
         result = await conn.fetchval(
-            "SELECT id FROM transactions WHERE bank_transaction_id = $1",
-            tx_hash
+            "SELECT id FROM transactions WHERE bank_transaction_id = $1 AND user_id = $2",
+            tx_hash, user_id
         )
         return str(result) if result else None
     except Exception as e:
@@ -408,7 +411,8 @@ async def sync_all_user_accounts(
     try:
         # Use provided connection or get a new one
         if db is None:
-            from app.database import db_pool
+            from app.database import get_db_pool
+            db_pool = get_db_pool()
             if not db_pool:
                 logger.warning("No database connection available")
                 return []
@@ -150,8 +150,9 @@ class TransactionService:
         for transaction in transactions:
             try:
                 # Check if transaction exists
+                # Rows inserted here carry no user_id, so scope to those
                 existing = await db.fetchrow(
-                    "SELECT id FROM transactions WHERE bank_transaction_id = $1",
+                    "SELECT id FROM transactions WHERE bank_transaction_id = $1 AND user_id IS NULL",
                     transaction.id
                 )
 
@@ -160,8 +161,8 @@ class TransactionService:
                     await db.execute("""
                         UPDATE transactions 
                         SET amount = $2, raw_desc = $3, updated_at = $4
-                        WHERE bank_transaction_id = $1
-                    """, transaction.id, transaction.amount, transaction.raw_desc, datetime.utcnow())
+                        WHERE id = $1
+                    """, existing["id"], transaction.amount, transaction.raw_desc, datetime.utcnow())
                     updated_count += 1
                 else:
                     # Insert new
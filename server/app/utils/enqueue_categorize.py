@@ -9,6 +9,10 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# RQ queues; workers drain the priority queue first
+CATEGORIZE_QUEUE = 'categorize'
+CATEGORIZE_PRIORITY_QUEUE = 'categorize_priority'
+
 def enqueue_categorize(tx_id: str) -> bool:
     """
     Enqueue a transaction categorization job
@@ -24,7 +28,7 @@ def enqueue_categorize(tx_id: str) -> bool:
         redis_conn = redis.from_url(redis_url)
 
         # Create queue
-        queue = Queue('categorize', connection=redis_conn)
+        queue = Queue(CATEGORIZE_QUEUE, connection=redis_conn)
 
         # Import the job function
         from app.workers.rq_worker import categorize_transaction_job
@@ -58,6 +62,39 @@ def enqueue_bulk_categorize(tx_ids: list) -> int:
     logger.info(f"📊 Enqueued {success_count}/{len(tx_ids)} categorization jobs")
     return success_count
 
+def enqueue_categorize_batch(tx_ids: list, priority: bool = False) -> bool:
+    """
+    Enqueue a single job that categorizes a batch of transactions
+
+    Args:
+        tx_ids: List of transaction IDs to process
+        priority: Use the priority queue (user-initiated work)
+
+    Returns:
+        bool: True if successfully enqueued, False otherwise
+    """
+    if not tx_ids:
+        return True
+
+    try:
+        redis_url = os.getenv("REDIS_URL", "redis://localhost:6379")
+        redis_conn = redis.from_url(redis_url)
+
+        queue_name = CATEGORIZE_PRIORITY_QUEUE if priority else CATEGORIZE_QUEUE
+        queue = Queue(queue_name, connection=redis_conn)
+
+        # Import the job function
+        from app.workers.rq_worker import categorize_transactions_batch_job
+
+        job = queue.enqueue(categorize_transactions_batch_job, list(tx_ids))
+
+        logger.info(f"✅ Enqueued batch categorization job for {len(tx_ids)} transactions on '{queue_name}', job ID: {job.id}")
+        return True
+
+    except Exception as e:
+        logger.error(f"❌ Failed to enqueue batch categorization job for {len(tx_ids)} transactions: {e}")
+        return False
+
 # CLI usage
 if __name__ == '__main__':
     import sys
@@ -1,12 +1,12 @@
 """
 RQ Worker for Transaction Categorization
-Processes transactions from Redis queue "categorize"
+Processes transactions from Redis queues "categorize_priority" and "categorize"
 """
 
 import os
 import asyncio
 import logging
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 import asyncpg
 from rq import Worker, Queue, Connection
 import redis
@@ -14,6 +14,7 @@ from datetime import datetime
 
 from app.services.parser import parse_transaction
 from app.database import db_pool, set_db_pool
+from app.utils.enqueue_categorize import CATEGORIZE_QUEUE, CATEGORIZE_PRIORITY_QUEUE
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -34,7 +35,7 @@ async def setup_db_connection():
         return None
 
 async def load_transaction_by_id(tx_id: str) -> Optional[Dict[str, Any]]:
-    """Load transaction from database by ID"""
+    """Load transaction from database by its UUID"""
     if not db_pool:
         logger.error("Database pool not available")
         return None
@@ -45,7 +46,7 @@ async def load_transaction_by_id(tx_id: str) -> Optional[Dict[str, Any]]:
                 SELECT id, bank_transaction_id, ts, amount, type, raw_desc, 
                        account_id, merchant, category, processed_at
                 FROM transactions 
-                WHERE bank_transaction_id = $1
+                WHERE id = $1::uuid
             """, tx_id)
 
             if row:
@@ -69,7 +70,7 @@ async def save_parsed_transaction(tx_id: str, parsed_data: Dict[str, Any]) -> bo
             await conn.execute("""
                 UPDATE transactions 
                 SET merchant = $1, category = $2, processed_at = $3, updated_at = $4
-                WHERE bank_transaction_id = $5
+                WHERE id = $5::uuid
             """, 
                 parsed_data["merchant_candidate"],
                 parsed_data["category_candidate"], 
@@ -166,6 +167,31 @@ def categorize_transaction_job(tx_id: str):
     finally:
         loop.close()
 
+def categorize_transactions_batch_job(tx_ids: List[str]):
+    """
+    RQ job function for categorizing a batch of transactions
+
+    Runs the same workflow as categorize_transaction_job for each ID,
+    sharing one event loop across the batch. A failure on one transaction
+    is recorded in its result and does not stop the rest of the batch.
+    """
+    logger.info(f"🔄 Processing batch categorization job for {len(tx_ids)} transactions")
+
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+
+    try:
+        results = []
+        for tx_id in tx_ids:
+            try:
+                results.append(loop.run_until_complete(_categorize_transaction_async(tx_id)))
+            except Exception as e:
+                logger.error(f"❌ Batch categorization failed for transaction {tx_id}: {e}")
+                results.append({"success": False, "transaction_id": tx_id, "error": str(e)})
+        return results
+    finally:
+        loop.close()
+
 async def _categorize_transaction_async(tx_id: str) -> Dict[str, Any]:
     """Async implementation of transaction categorization workflow"""
     try:
@@ -221,15 +247,18 @@ def run_worker():
     # Connect to Redis
     redis_conn = redis.from_url(redis_url)
 
-    # Create queue
-    queue = Queue('categorize', connection=redis_conn)
+    # Create queues; RQ checks them in order, so priority jobs go first
+    queues = [
+        Queue(CATEGORIZE_PRIORITY_QUEUE, connection=redis_conn),
+        Queue(CATEGORIZE_QUEUE, connection=redis_conn)
+    ]
 
-    logger.info("🚀 Starting RQ worker for 'categorize' queue...")
+    logger.info("🚀 Starting RQ worker for 'categorize_priority' and 'categorize' queues...")
     logger.info(f"Redis URL: {redis_url}")
 
     # Start worker
     with Connection(redis_conn):
-        worker = Worker([queue])
+        worker = Worker(queues)
         worker.work()
 
 if __name__ == '__main__':
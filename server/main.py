@@ -8,7 +8,12 @@ import redis.asyncio as redis
 import logging
 
 from app.routes import transactions, qa, auth, aa, aa_admin, analytics
-from app.database import get_db, init_db, close_db
+from app.database import (
+    get_db, get_db_pool, init_db, close_db, init_connection, use_mock_db,
+    POOL_STATEMENT_CACHE_SIZE, POOL_SERVER_SETTINGS, POOL_MAX_QUERIES, POOL_MAX_INACTIVE_LIFETIME
+)
+from app.deps.auth import start_revocation_listener, stop_revocation_listener
+from app.routes.aa_admin import close_admin_clients as close_aa_admin_clients
 import os
 import httpx
 
@@ -58,13 +63,28 @@ async def lifespan(app: FastAPI):
 
     # Try to connect to PostgreSQL (optional for development)
     try:
-        db_pool = await asyncpg.create_pool(database_url)
+        pool_size = int(os.getenv("DB_POOL_SIZE", "10"))
+        db_pool = await asyncpg.create_pool(
+            database_url,
+            min_size=pool_size,
+            max_size=pool_size,
+            max_queries=POOL_MAX_QUERIES,
+            max_inactive_connection_lifetime=POOL_MAX_INACTIVE_LIFETIME,
+            statement_cache_size=POOL_STATEMENT_CACHE_SIZE,
+            command_timeout=30,
+            server_settings=POOL_SERVER_SETTINGS,
+            init=init_connection
+        )
         await init_db(db_pool)
+        await start_revocation_listener(database_url)
         print("✅ Connected to PostgreSQL")
     except Exception as e:
         logger.warning(f"PostgreSQL connection failed: {e}")
         print("⚠️  Running without database (development mode)")
 
+    if get_db_pool() is None:
+        use_mock_db(app)
+
     # Try to connect to Redis (optional for development)
     try:
         redis_client = redis.from_url(redis_url)
@@ -78,11 +98,13 @@ async def lifespan(app: FastAPI):
         # Pass Redis client to modules that need it
         from app.routes.transactions import set_redis_client as set_transactions_redis
         from app.routes.auth import set_redis_client as set_auth_redis
+        from app.deps.auth import set_redis_client as set_auth_deps_redis
         from app.services.sync import set_redis_client as set_sync_redis
         from app.workers.aa_worker import AAWorker
 
         set_transactions_redis(redis_client)
         set_auth_redis(redis_client)
+        set_auth_deps_redis(redis_client)
         set_sync_redis(redis_client)
 
     except Exception as e:
@@ -99,8 +121,10 @@ async def lifespan(app: FastAPI):
     yield
 
     # Shutdown
-    if db_pool:
-        await db_pool.close()
+    await stop_revocation_listener()
+    await close_aa_admin_clients()
+    # Also stops a background index build still holding pool connections
+    await close_db()
     if redis_client:
         await redis_client.close()
     print("❌ Server shutdown complete")
@@ -263,4 +287,19 @@ async def proxy_anomalies(query: dict, request: Request):
             "execution_time_ms": 15
         }
 
-# Example: Run with uvicorn main:app --reload --host 0.0.0.0 --port 8000
\ No newline at end of file
+# Example: Run with uvicorn main:app --reload --host 0.0.0.0 --port 8000 --loop uvloop --http httptools
+
+if __name__ == "__main__":
+    import uvicorn
+
+    # uvloop and httptools ship with uvicorn[standard]; pin them rather than relying on "auto".
+    # These settings only apply to `python main.py`; the uvicorn CLI needs
+    # --loop uvloop --http httptools (see the example above)
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=8000,
+        loop="uvloop",
+        http="httptools",
+        log_level="info"
+    )
@@ -0,0 +1,188 @@
+"""
+AA manual sync tests
+
+Covers POST /aa/sync in app.routes.aa: each account's transactions go in as
+one unnest() batch insert with the arrays bound in column order, the ids it
+returns are enqueued as a single categorization job, and a failed fetch is
+reported against its own account.
+"""
+
+import asyncio
+import os
+import sys
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+from fastapi import BackgroundTasks
+
+# Add the server directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import _prepared_statements
+from app.deps.auth import AuthenticatedUser
+from app.models.aa_models import AASyncStatus
+from app.routes import aa
+from app.routes.aa import _INSERT_TX_BATCH_SQL, enqueue_categorize_batch_job, sync_transactions
+
+
+class FakeStatement:
+    """Batch insert that skips bank ids already stored, returning ids for the rest"""
+
+    def __init__(self, connection, query):
+        self.connection = connection
+        self.query = query
+
+    async def fetch(self, *args):
+        assert self.query == _INSERT_TX_BATCH_SQL
+        self.connection.batches.append(args)
+        rows = []
+        for bank_id in args[0]:
+            if bank_id not in self.connection.existing:
+                self.connection.existing.add(bank_id)
+                rows.append({"id": uuid.uuid4()})
+        self.connection.inserted_ids.extend(str(row["id"]) for row in rows)
+        return rows
+
+
+class FakeConnection:
+    """Stands in for an asyncpg connection with a user's linked accounts"""
+
+    def __init__(self, accounts, existing=()):
+        self.accounts = accounts
+        self.existing = set(existing)
+        self.batches = []
+        self.inserted_ids = []
+        self.sync_logs = []
+
+    async def fetch(self, query, *args):
+        return self.accounts
+
+    async def prepare(self, query):
+        return FakeStatement(self, query)
+
+    async def execute(self, query, *args):
+        pass
+
+    async def executemany(self, query, rows):
+        self.sync_logs.extend(rows)
+
+
+class FakeAAClient:
+    def __init__(self, transactions_by_account):
+        self.transactions_by_account = transactions_by_account
+
+    async def fetch_transactions(self, account_id, since_ts, limit):
+        result = self.transactions_by_account[account_id]
+        if isinstance(result, BaseException):
+            raise result
+        return result
+
+
+def _account(aa_account_id):
+    return {
+        "id": uuid.uuid4(),
+        "aa_account_id": aa_account_id,
+        "display_name": f"Account {aa_account_id}",
+        "since_ts": datetime(2024, 7, 1, tzinfo=timezone.utc)
+    }
+
+
+def _user():
+    return AuthenticatedUser(
+        id=str(uuid.uuid4()),
+        email="test@example.com",
+        created_at=datetime.now(timezone.utc),
+        aa_account_id=None,
+        token_id=str(uuid.uuid4()),
+        token_type="access"
+    )
+
+
+TRANSACTIONS = [
+    {"id": "bank-1", "ts": "2024-07-02T10:00:00Z", "amount": "250.50", "type": "debit", "raw_desc": "UPI/SWIGGY"},
+    {"id": "bank-2", "ts": "2024-07-03T12:30:00+05:30", "amount": 1000, "type": "credit", "raw_desc": "SALARY"},
+    {"id": "bank-3", "ts": "2024-07-04T08:15:00Z", "amount": 99.99, "type": "debit", "raw_desc": "UBER"}
+]
+
+
+@pytest.fixture(autouse=True)
+def clean_prepared_statements():
+    """Prepared statements are cached per connection; start each test without any"""
+    _prepared_statements.clear()
+    yield
+    _prepared_statements.clear()
+
+
+def test_batch_insert_sql_binds_arrays_in_column_order():
+    sql = " ".join(_INSERT_TX_BATCH_SQL.split())
+    casts = ["$1::text[]", "$2::timestamptz[]", "$3::float8[]", "$4::transaction_type[]", "$5::text[]"]
+    positions = [sql.index(cast) for cast in casts]
+    assert positions == sorted(positions)
+    assert "AS t(bank_transaction_id, ts, amount, type, raw_desc)" in sql
+    assert "t.amount::numeric(15,2)" in sql
+    assert "ON CONFLICT ON CONSTRAINT uq_tx_user_bank DO NOTHING RETURNING id" in sql
+
+
+@pytest.mark.asyncio
+async def test_sync_inserts_one_batch_and_enqueues_returned_ids(monkeypatch):
+    account = _account("acc-1")
+    db = FakeConnection([account], existing={"bank-2"})
+    monkeypatch.setattr(aa, "aa_client", FakeAAClient({"acc-1": TRANSACTIONS}))
+    user = _user()
+    background_tasks = BackgroundTasks()
+
+    result = await sync_transactions(user=user, db=db, background_tasks=background_tasks)
+
+    # One statement for the account, arrays aligned with the unnest() columns
+    [(bank_ids, timestamps, amounts, types, descriptions, user_id, account_id, created_at)] = db.batches
+    assert bank_ids == ["bank-1", "bank-2", "bank-3"]
+    assert timestamps == [
+        datetime(2024, 7, 2, 10, 0, tzinfo=timezone.utc),
+        datetime.fromisoformat("2024-07-03T12:30:00+05:30"),
+        datetime(2024, 7, 4, 8, 15, tzinfo=timezone.utc)
+    ]
+    assert all(ts.tzinfo is not None for ts in timestamps)
+    assert amounts == [250.5, 1000.0, 99.99]
+    assert all(type(amount) is float for amount in amounts)
+    assert types == ["debit", "credit", "debit"]
+    assert descriptions == ["UPI/SWIGGY", "SALARY", "UBER"]
+    assert (user_id, account_id) == (user.id, "acc-1")
+    assert isinstance(created_at, datetime)
+
+    # The duplicate is skipped and the returned ids are enqueued as one job
+    assert result["total_inserted"] == 2
+    assert result["results"][0]["duplicate_count"] == 1
+    [task] = background_tasks.tasks
+    assert task.func is enqueue_categorize_batch_job
+    assert task.args == (db.inserted_ids,)
+
+    [log] = db.sync_logs
+    assert log[4] == AASyncStatus.COMPLETED and log[5] == 2
+
+
+@pytest.mark.asyncio
+async def test_failed_fetch_is_reported_against_its_account(monkeypatch):
+    db = FakeConnection([_account("acc-1"), _account("acc-2")])
+    monkeypatch.setattr(aa, "aa_client", FakeAAClient({
+        "acc-1": RuntimeError("AA timeout"),
+        "acc-2": TRANSACTIONS[:1]
+    }))
+
+    result = await sync_transactions(user=_user(), db=db, background_tasks=BackgroundTasks())
+
+    failed, succeeded = result["results"]
+    assert failed["status"] == "error" and "AA timeout" in failed["error"]
+    assert succeeded["status"] == "success" and succeeded["inserted_count"] == 1
+    assert [log[4] for log in db.sync_logs] == [AASyncStatus.FAILED, AASyncStatus.COMPLETED]
+
+
+@pytest.mark.asyncio
+async def test_cancelled_fetch_is_not_treated_as_transactions(monkeypatch):
+    db = FakeConnection([_account("acc-1")])
+    monkeypatch.setattr(aa, "aa_client", FakeAAClient({"acc-1": asyncio.CancelledError()}))
+
+    with pytest.raises(asyncio.CancelledError):
+        await sync_transactions(user=_user(), db=db, background_tasks=BackgroundTasks())
+
+    assert db.batches == []
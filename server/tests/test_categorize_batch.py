@@ -0,0 +1,118 @@
+"""
+Batch categorization job tests
+
+Covers categorize_transactions_batch_job in app.workers.rq_worker: rows are
+looked up and updated by transaction UUID, and one failing transaction does
+not abort the rest of the batch.
+"""
+
+import os
+import sys
+import uuid
+
+import pytest
+
+# Add the server directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.workers import rq_worker
+
+
+class FakeConnection:
+    """Stands in for an asyncpg connection over an in-memory transactions table"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.queries = []
+
+    async def fetchrow(self, query, tx_id):
+        self.queries.append(query)
+        return self.rows.get(tx_id)
+
+    async def execute(self, query, *args):
+        self.queries.append(query)
+        if query.lstrip().startswith("UPDATE transactions"):
+            merchant, category, processed_at, _updated_at, tx_id = args
+            self.rows[tx_id].update(merchant=merchant, category=category, processed_at=processed_at)
+
+
+class FakePool:
+    def __init__(self, connection):
+        self.connection = connection
+
+    def acquire(self):
+        return self
+
+    async def __aenter__(self):
+        return self.connection
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+
+def _row(tx_id, raw_desc):
+    return {
+        "id": tx_id,
+        "bank_transaction_id": f"bank-{tx_id[:8]}",
+        "ts": None,
+        "amount": 100.0,
+        "type": "debit",
+        "raw_desc": raw_desc,
+        "account_id": "acc-1",
+        "merchant": None,
+        "category": None,
+        "processed_at": None
+    }
+
+
+@pytest.fixture
+def worker_db(monkeypatch):
+    """Two unprocessed transactions keyed by UUID, and a parser that fails on one of them"""
+    good_id, bad_id = str(uuid.uuid4()), str(uuid.uuid4())
+    connection = FakeConnection({
+        good_id: _row(good_id, "UPI/SWIGGY/food"),
+        bad_id: _row(bad_id, "BROKEN")
+    })
+    monkeypatch.setattr(rq_worker, "db_pool", FakePool(connection))
+
+    async def fake_parse(raw_desc):
+        if raw_desc == "BROKEN":
+            raise RuntimeError("parser exploded")
+        return {"merchant_candidate": "Swiggy", "category_candidate": "food", "confidence": 0.9}
+
+    monkeypatch.setattr(rq_worker, "parse_transaction", fake_parse)
+    return connection, good_id, bad_id
+
+
+def test_batch_job_looks_up_and_updates_by_uuid(worker_db):
+    connection, good_id, _ = worker_db
+
+    [result] = rq_worker.categorize_transactions_batch_job([good_id])
+
+    assert result["success"] is True
+    assert result["transaction_id"] == good_id
+    assert connection.rows[good_id]["category"] == "food"
+    assert connection.rows[good_id]["processed_at"] is not None
+    for query in connection.queries[:2]:
+        assert "WHERE id = " in query
+        assert "WHERE bank_transaction_id" not in query
+
+
+def test_batch_job_continues_past_a_failing_transaction(worker_db, monkeypatch):
+    connection, good_id, bad_id = worker_db
+    categorize = rq_worker._categorize_transaction_async
+
+    async def flaky_categorize(tx_id):
+        if tx_id == "boom":
+            raise RuntimeError("worker crashed")
+        return await categorize(tx_id)
+
+    monkeypatch.setattr(rq_worker, "_categorize_transaction_async", flaky_categorize)
+
+    results = rq_worker.categorize_transactions_batch_job(["boom", bad_id, good_id])
+
+    assert [r["success"] for r in results] == [False, False, True]
+    assert results[0] == {"success": False, "transaction_id": "boom", "error": "worker crashed"}
+    assert results[1]["error"] == "parser exploded"
+    assert connection.rows[bad_id]["processed_at"] is None
+    assert connection.rows[good_id]["category"] == "food"
@@ -0,0 +1,126 @@
+"""
+Token revocation tests for the auth dependency
+
+Covers the in-process caches in app.deps.auth: a token revoked with
+blacklist_token() is rejected straight away, and a revocation arriving over
+LISTEN/NOTIFY drops any cached "not blacklisted" result.
+"""
+
+import os
+import sys
+import uuid
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+
+# Add the server directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.deps import auth
+from app.deps.auth import (
+    TOKEN_REVOKED_CHANNEL, AuthenticatedUser, _AUTH_CONTEXT_SQL, _LOAD_USER_SQL,
+    _on_token_revoked, _resolve_user, _token_ok_cache, blacklist_token
+)
+from app.security import create_access_token, decode_token
+
+
+class FakeStatement:
+    """Prepared statement answering the auth queries from FakeConnection state"""
+
+    def __init__(self, connection, query):
+        self.connection = connection
+        self.query = query
+
+    async def fetchrow(self, *args):
+        self.connection.queries += 1
+        if self.query == _AUTH_CONTEXT_SQL:
+            token_id, user_id = args
+            return {**self.connection.user_row(user_id), "blacklisted": token_id in self.connection.revoked}
+        if self.query == _LOAD_USER_SQL:
+            return self.connection.user_row(args[0])
+        raise AssertionError(f"Unexpected query: {self.query}")
+
+
+class FakeConnection:
+    """Stands in for an asyncpg connection: one user, no revoked sessions, records NOTIFYs"""
+
+    def __init__(self, user_id):
+        self.user_id = user_id
+        self.revoked = set()
+        self.notified = []
+        self.queries = 0
+
+    def user_row(self, user_id):
+        assert user_id == self.user_id
+        return {
+            "id": user_id,
+            "email": "test@example.com",
+            "created_at": datetime.now(timezone.utc),
+            "aa_account_id": None
+        }
+
+    async def prepare(self, query):
+        return FakeStatement(self, query)
+
+    async def execute(self, query, *args):
+        if "pg_notify" in query:
+            self.notified.append(args)
+
+
+@pytest.fixture(autouse=True)
+def clean_auth_state(monkeypatch):
+    """Run each test with empty caches and without Redis"""
+    monkeypatch.setattr(auth, "redis_client", None)
+    for cache in (auth._token_ok_cache, auth._token_blacklisted_cache, auth._decoded_token_cache):
+        cache.clear()
+    yield
+    for cache in (auth._token_ok_cache, auth._token_blacklisted_cache, auth._decoded_token_cache):
+        cache.clear()
+
+
+@pytest.fixture
+def session():
+    """A fresh access token, its jti, and a connection that knows its user"""
+    user_id = uuid.uuid4()
+    token_id = str(uuid.uuid4())
+    token = create_access_token({"sub": str(user_id), "email": "test@example.com"}, token_id=token_id)
+    return token, token_id, FakeConnection(user_id)
+
+
+def _request():
+    return SimpleNamespace(state=SimpleNamespace())
+
+
+@pytest.mark.asyncio
+async def test_revoked_token_rejected_immediately(session):
+    token, token_id, db = session
+
+    # First use succeeds and caches the token as not blacklisted
+    user = await _resolve_user(_request(), token, db)
+    assert isinstance(user, AuthenticatedUser)
+    assert token_id in _token_ok_cache
+
+    await blacklist_token(token_id, decode_token(token)["exp"], db)
+
+    # Rejected on the very next request, without waiting for the ok-cache TTL
+    queries_before = db.queries
+    assert await _resolve_user(_request(), token, db) == "Token has been revoked"
+    assert db.queries == queries_before
+
+    # Other workers are told over the revocation channel
+    assert db.notified == [(TOKEN_REVOKED_CHANNEL, token_id)]
+
+
+@pytest.mark.asyncio
+async def test_revocation_notification_drops_ok_cache_entry(session):
+    token, token_id, db = session
+
+    assert isinstance(await _resolve_user(_request(), token, db), AuthenticatedUser)
+    assert token_id in _token_ok_cache
+
+    # Another worker revoked the token and NOTIFY delivered it here
+    _on_token_revoked(None, 4242, TOKEN_REVOKED_CHANNEL, token_id)
+
+    assert token_id not in _token_ok_cache
+    assert await _resolve_user(_request(), token, db) == "Token has been revoked"
@@ -0,0 +1,285 @@
+"""
+Unit tests for the Financial Insights Engine
+
+Unlike test_insights_engine.py, these need no running service: the engine is
+exercised directly against in-memory stand-ins for the database.
+"""
+
+import asyncio
+import os
+import statistics
+import sys
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import numpy as np
+import pytest
+
+# insights_engine imports the server's app package
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "server"))
+
+import insights_engine
+from insights_engine import (
+    AnomalyDetector, InsightsEngine, InsightsQuery, InsightsResponse, QueryContext,
+    TransactionCategory, TransactionColumns
+)
+
+
+def _transaction_rows(count):
+    start = datetime(2024, 7, 1)
+    return [
+        {
+            "bank_transaction_id": f"tx-{i}",
+            "ts": start + timedelta(hours=i),
+            "amount": 100.0 + i,
+            "type": "debit",
+            "raw_desc": f"UPI/MERCHANT{i}",
+            "merchant": f"Merchant {i}",
+            "category": "food"
+        }
+        for i in range(count)
+    ]
+
+
+class FakeStatement:
+    """Prepared statement over FakeConnection rows, recording how it was read"""
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    async def fetch(self, *args):
+        self.connection.calls.append(("fetch", args))
+        return self.connection.rows[:args[-1]]
+
+    async def cursor(self, *args, prefetch):
+        self.connection.calls.append(("cursor", args, prefetch))
+        assert self.connection.in_transaction
+        for row in self.connection.rows[:args[-1]]:
+            yield row
+
+
+class FakeTransaction:
+    def __init__(self, connection):
+        self.connection = connection
+
+    async def __aenter__(self):
+        self.connection.in_transaction = True
+
+    async def __aexit__(self, *exc_info):
+        self.connection.in_transaction = False
+        return False
+
+
+class FakeConnection:
+    """Stands in for an asyncpg connection holding one user's transactions"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.calls = []
+        self.in_transaction = False
+
+    async def prepare(self, query):
+        return FakeStatement(self)
+
+    def transaction(self):
+        return FakeTransaction(self)
+
+
+@pytest.fixture(scope="module")
+def engine():
+    return InsightsEngine()
+
+
+def _context():
+    end = datetime(2024, 7, 31)
+    return QueryContext(
+        user_id="00000000-0000-0000-0000-000000000001",
+        time_range_days=30,
+        start_date=end - timedelta(days=30),
+        end_date=end,
+        raw_question="Show my food transactions",
+        processed_question="show my food transactions",
+        question_lower="show my food transactions"
+    )
+
+
+def test_cursor_threshold_within_request_bound(engine):
+    # The largest request a client may make must reach the cursor path
+    largest = InsightsQuery(question="Show my transactions", max_transactions=100)
+    assert engine.SUPPORTING_CURSOR_THRESHOLD < largest.max_transactions
+
+
+@pytest.mark.asyncio
+async def test_supporting_transactions_small_request_uses_fetch(engine):
+    db = FakeConnection(_transaction_rows(120))
+
+    summaries = await engine._get_supporting_transactions(_context(), db, 10)
+
+    assert [s.id for s in summaries] == [f"tx-{i}" for i in range(10)]
+    assert [call[0] for call in db.calls] == ["fetch"]
+
+
+@pytest.mark.asyncio
+async def test_supporting_transactions_large_request_streams_through_cursor(engine):
+    db = FakeConnection(_transaction_rows(120))
+
+    summaries = await engine._get_supporting_transactions(_context(), db, 100)
+
+    assert len(summaries) == 100
+    assert summaries[-1].id == "tx-99"
+    assert summaries[-1].amount == 199.0
+    [(kind, args, prefetch)] = db.calls
+    assert kind == "cursor"
+    assert args[-1] == 100
+    assert prefetch == engine.SUPPORTING_CURSOR_PREFETCH
+    assert not db.in_transaction
+
+
+# Feature kernels and the grouped median, against a naive reference
+
+FIXTURE_TRANSACTIONS = [
+    {"id": f"tx-{i}", "ts": datetime(2024, 7, 1 + i % 7, (7 * i) % 24), "amount": amount,
+     "type": tx_type, "raw_desc": "x" * (5 + i), "merchant": merchant, "category": category}
+    for i, (amount, tx_type, merchant, category) in enumerate([
+        (120.0, "debit", "Swiggy", "food"),
+        (80.0, "debit", "Zomato", "food"),
+        (300.0, "debit", "Swiggy", "food"),
+        (55.5, "debit", "Uber", "transport"),
+        (5000.0, "credit", "Employer", "income"),
+        (42.0, "debit", "Uber", "transport"),
+        (999.0, "debit", "Amazon", "shopping"),
+        (15.0, "debit", "Kiosk", "misc"),
+        (200.0, "debit", "Zomato", "food"),
+        (61.0, "debit", "Ola", "transport"),
+    ])
+]
+
+
+def _naive_features(detector, transactions, typical_amounts, merchant_counts):
+    rows = []
+    for tx in transactions:
+        if tx["type"] != "debit":
+            continue
+        amount = tx["amount"]
+        typical = typical_amounts.get(tx["category"], amount)
+        one_hot = [1.0 if tx["category"] == c else 0.0 for c in detector.FEATURE_CATEGORIES]
+        rows.append([
+            amount, amount / max(typical, 1.0), merchant_counts.get(tx["merchant"], 0),
+            len(tx["raw_desc"]), tx["ts"].hour, tx["ts"].weekday(), *one_hot
+        ])
+    return np.array(rows, dtype=np.float32)
+
+
+def _naive_profile(transactions):
+    by_category, merchant_counts = {}, {}
+    for tx in transactions:
+        if tx["type"] == "debit":
+            by_category.setdefault(tx["category"], []).append(tx["amount"])
+            merchant_counts[tx["merchant"]] = merchant_counts.get(tx["merchant"], 0) + 1
+    return {c: statistics.median(a) for c, a in by_category.items()}, merchant_counts
+
+
+@pytest.fixture
+def detector():
+    return AnomalyDetector()
+
+
+def test_grouped_median_matches_naive_median(detector):
+    columns = TransactionColumns.from_transactions(FIXTURE_TRANSACTIONS)
+
+    profile, _ = detector._profile_and_features("user-1", columns)
+
+    expected_medians, expected_merchants = _naive_profile(FIXTURE_TRANSACTIONS)
+    assert profile.typical_amounts == pytest.approx(expected_medians)
+    assert profile.typical_merchants == expected_merchants
+
+
+@pytest.mark.parametrize("use_numba", [
+    False,
+    pytest.param(True, marks=pytest.mark.skipif(not insights_engine.NUMBA_AVAILABLE, reason="numba not installed"))
+])
+def test_feature_kernel_matches_naive_reference(detector, monkeypatch, use_numba):
+    monkeypatch.setattr(insights_engine, "NUMBA_AVAILABLE", use_numba)
+    columns = TransactionColumns.from_transactions(FIXTURE_TRANSACTIONS)
+    expected_medians, expected_merchants = _naive_profile(FIXTURE_TRANSACTIONS)
+
+    _, features = detector._profile_and_features("user-1", columns)
+    np.testing.assert_allclose(
+        features, _naive_features(detector, FIXTURE_TRANSACTIONS, expected_medians, expected_merchants),
+        rtol=1e-6
+    )
+
+    # New rows against an existing profile, including an unseen category and merchant
+    profile = detector.user_profiles["user-1"]
+    new_transactions = [
+        {"id": "new-1", "ts": datetime(2024, 8, 1, 9), "amount": 450.0, "type": "debit",
+         "raw_desc": "UPI/SWIGGY", "merchant": "Swiggy", "category": "food"},
+        {"id": "new-2", "ts": datetime(2024, 8, 2, 23), "amount": 75.0, "type": "debit",
+         "raw_desc": "NEW SHOP", "merchant": "Brand New", "category": "bills"},
+    ]
+    np.testing.assert_allclose(
+        detector._extract_features(TransactionColumns.from_transactions(new_transactions), profile),
+        _naive_features(detector, new_transactions, expected_medians, expected_merchants),
+        rtol=1e-6
+    )
+
+
+# Question filters are bound as parameters, never spliced into the SQL
+
+def test_additional_filters_bind_values_as_placeholders(engine):
+    category = next(iter(TransactionCategory)).value
+    question = f"how much {category} over ₹1,500 at swiggy"
+
+    sql, params = engine._build_additional_filters(_context(), question, first_placeholder=4)
+
+    assert sql == "AND category = $4 AND amount > $5 AND LOWER(merchant) LIKE $6"
+    assert params == [category, Decimal("1500"), "%swiggy%"]
+
+
+def test_additional_filters_keep_sql_text_stable(engine):
+    sql_a, params_a = engine._build_additional_filters(_context(), "spent over ₹200 at uber", first_placeholder=2)
+    sql_b, params_b = engine._build_additional_filters(_context(), "spent over ₹9,999 at uber", first_placeholder=2)
+
+    assert sql_a == sql_b == "AND amount > $2 AND LOWER(merchant) LIKE $3"
+    assert params_a == [Decimal("200"), "%uber%"]
+    assert params_b == [Decimal("9999"), "%uber%"]
+    assert engine._build_additional_filters(_context(), "what did i spend", first_placeholder=4) == ("", [])
+
+
+# Concurrent identical questions share one computation
+
+@pytest.mark.asyncio
+async def test_identical_concurrent_queries_share_one_computation(engine, monkeypatch):
+    engine._response_cache.clear()
+    release = asyncio.Event()
+    calls = []
+
+    async def slow_process_query(query, db, question_lower=None):
+        calls.append(query.question)
+        await release.wait()
+        return InsightsResponse(
+            question=query.question, answer="₹1,000.00", confidence=0.9, execution_time_ms=1.0
+        )
+
+    monkeypatch.setattr(engine, "_process_query", slow_process_query)
+    query = InsightsQuery(question="How much did I spend?", user_id="user-1")
+
+    pending = [asyncio.create_task(engine.process_query(query, None)) for _ in range(3)]
+    await asyncio.sleep(0)
+    assert len(engine._inflight_queries) == 1
+
+    release.set()
+    responses = await asyncio.gather(*pending)
+
+    assert calls == ["How much did I spend?"]
+    assert {r.answer for r in responses} == {"₹1,000.00"}
+    assert engine._inflight_queries == {}
+
+    # Answered from the response cache afterwards
+    assert (await engine.process_query(query, None)).answer == "₹1,000.00"
+    assert len(calls) == 1
+
+    # A different user's identical question is computed separately
+    other = InsightsQuery(question="How much did I spend?", user_id="user-2")
+    await engine.process_query(other, None)
+    assert len(calls) == 2